@@ -3,15 +3,67 @@
 #Pong-Classic by Isa Bolling
 import os
 os.environ['PYSDL2_DLL_PATH'] = os.path.dirname(os.path.abspath(__file__))
-from sdl2 import *
+from sdl2 import SDL_Init, SDL_Quit, SDL_INIT_VIDEO, SDL_INIT_GAMECONTROLLER, SDL_INIT_EVENTS
+from sdl2.blendmode import *
+from sdl2.error import *
+from sdl2.events import *
+from sdl2.keyboard import *
+from sdl2.mouse import *
+from sdl2.pixels import *
+from sdl2.rect import *
+from sdl2.render import *
+from sdl2.scancode import *
+from sdl2.surface import *
+from sdl2.timer import *
+from sdl2.video import *
 from sdl2.sdlttf import *
+import sdl2.dll
 import ctypes
+import argparse
+import json
+import platform
+import sys
+import random
+import socket
+import struct
+import time
+import zlib
+import hashlib
+import threading
+import queue
+import collections
 from math import *
+from collision import *
+import netplay
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # GLOBALS______________________________________________________________________________________________________
 DEBUG = False
+FONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'font', 'joystix.ttf')
 WIDTH = 1280
 HEIGHT = 720
+TICK_RATE = 120
+MAX_TICKS = 60000
+MAX_FRAME_TIME = 0.25
+MAX_BOUNCES = 4
+IDLE_TIMEOUT = 250
+""" (reaction, error) of the computer player, see Predictor """
+DIFFICULTIES = {'easy': (0.6, 1.5), 'normal': (0.4, 1.2), 'hard': (0.2, 0.9), 'perfect': (0.0, 0.0)}
+""" The ball only ever heads in whole degrees (the paddle angles, 360 - degree off the
+    walls, and the 1 and 180 it starts with), so the direction of each one is worked out
+    once here, and moving or bouncing the ball is only a table lookup. """
+DIRECTIONS = tuple((cos(radians(degree)), sin(radians(degree))) for degree in range(361))
+PADDLE_ANGLES = ((300, 315, 330, 0, 30, 45, 60), (240, 225, 210, 180, 150, 135, 120))
+ACTION_PAUSE = 16
+ACTION_START = 32
+ACTION_RESTART = 64
+ACTION_MENU = 128
+REPLAY_MAGIC = b'PONGREC1'
+CAPTURE_MAGIC = b'PONGCAP1'
+ATLAS_CHARACTERS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz .,:;!?%/-+()'
 
 # CLASSES______________________________________________________________________________________________________
 class Pointer:
@@ -20,45 +72,199 @@ class Pointer:
     def __init__(self):
         self.pointer = SDL_Rect(0, 0, 10, 10)
         self.clicking = False
-
-    def Compute(self, event):
-        self.Set_Cursor(SDL_SYSTEM_CURSOR_ARROW)
+        self.cursor = None
+        self.hovered = None
+        self.layout = None
+        self.moved = True
+
+    def Begin(self):
+        """ Called once a frame before the events are handled, so a click only counts
+            for the frame it happened in """
         self.clicking = False
 
-        if(event.type == SDL_MOUSEBUTTONDOWN):
-            if(event.button.button == SDL_BUTTON_LEFT):
-                self.clicking = True
-
-        if(event.type == SDL_MOUSEMOTION):
-            self.pointer.x = event.motion.x
-            self.pointer.y = event.motion.y
+    def Move_To(self, x, y):
+        if x != self.pointer.x or y != self.pointer.y:
+            self.pointer.x = x
+            self.pointer.y = y
+            self.moved = True
+
+    def Motion(self, event):
+        self.Move_To(event.motion.x, event.motion.y)
+
+    def Button(self, event):
+        if(event.button.button == SDL_BUTTON_LEFT):
+            self.Move_To(event.button.x, event.button.y)
+            self.clicking = True
+
+    def Hover(self, items, ignore = (), layout = None):
+        """ Finds which of the items (a dict of TextObjects, or None) is under the
+            pointer, leaving out the names in ignore. It is only worked out again when
+            the pointer has moved or different items (or a different layout) are passed
+            in, and the highlights and the cursor only change when the hovered item does. """
+        key = (id(items), layout)
+        if not self.moved and key == self.layout:
+            return self.hovered
+        self.moved = False
+        self.layout = key
+        hovered = None
+        if items:
+            for name in items:
+                if name not in ignore and self.Is_Touching(items[name]):
+                    hovered = items[name]
+                    break
+        if hovered is not self.hovered:
+            if self.hovered is not None:
+                self.hovered.highlight = False
+            if hovered is not None:
+                hovered.highlight = True
+            self.hovered = hovered
+        self.Set_Cursor(SDL_SYSTEM_CURSOR_ARROW if hovered is None else SDL_SYSTEM_CURSOR_HAND)
+        return hovered
 
     def Is_Touching(self, item):
         return SDL_HasIntersection(self.pointer, item.rect)
 
     def Is_Clicking(self, item):
-        return self.Is_Touching(item) and self.clicking
+        """ Only items passed to Hover this frame can be clicked """
+        return self.clicking and self.hovered is item
 
     def Set_Cursor(self, id):
+        """ SDL is only asked to change the cursor when it is a different one """
+        if id == self.cursor:
+            return
         if id not in Pointer.cursors:
             Pointer.cursors[id] = SDL_CreateSystemCursor(id)
         SDL_SetCursor(Pointer.cursors[id])
+        self.cursor = id
 
     def __del__(self):
         for cursor in Pointer.cursors:
             SDL_FreeCursor(Pointer.cursors[cursor])
 
 
+class EventPump:
+    def __init__(self, size = 64):
+        """ Takes the events off the queue in blocks of size with SDL_PeepEvents instead
+            of one SDL_PollEvent at a time, and hands each one to the handler for its
+            type. The types are read straight out of the array, so events with no handler
+            cost almost nothing, and a run of mouse motion events only reaches the
+            handler once, with the last position. """
+        self.size = size
+        self.events = (SDL_Event * size)()
+        self.types = memoryview(self.events).cast('B').cast('I')[::ctypes.sizeof(SDL_Event) // 4]
+        self.motion = SDL_Event()
+        self.handlers = dict()
+        self.count = 0
+
+    def On(self, type, handler):
+        self.handlers[type] = handler
+
+    def Pump(self):
+        """ returns how many events were taken off the queue """
+        handlers = self.handlers
+        events = self.events
+        types = self.types
+        motion = handlers.get(SDL_MOUSEMOTION)
+        """ the index of the last motion event not handled yet, or -1 once it is copied
+            to self.motion """
+        pending = None
+        total = 0
+        SDL_PumpEvents()
+        while True:
+            count = SDL_PeepEvents(events, self.size, SDL_GETEVENT, SDL_FIRSTEVENT, SDL_LASTEVENT)
+            if count <= 0:
+                break
+            total += count
+            for i in range(count):
+                type = types[i]
+                if type == SDL_MOUSEMOTION:
+                    pending = i
+                    continue
+                handler = handlers.get(type)
+                if handler is None:
+                    continue
+                if pending is not None:
+                    """ motion before this event is handled first, keeping the order """
+                    if motion is not None:
+                        motion(events[pending] if pending >= 0 else self.motion)
+                    pending = None
+                handler(events[i])
+            if count < self.size:
+                break
+            if pending is not None and pending >= 0:
+                """ the next block overwrites the array """
+                ctypes.pointer(self.motion)[0] = events[pending]
+                pending = -1
+        if pending is not None and motion is not None:
+            motion(events[pending] if pending >= 0 else self.motion)
+        self.count = total
+        return total
+
+
+class FontHandle:
+    """ One user's share of a font that is open in a FontRegistry """
+    def __init__(self, registry, key, font):
+        self.registry = registry
+        self.key = key
+        self.font = font
+
+    def Release(self):
+        if self.font:
+            self.font = None
+            self.registry.Release(self.key)
+
+    def __del__(self):
+        self.Release()
+
+
+class FontRegistry:
+    def __init__(self):
+        """ Each (path, size) is only opened once, and is closed when the last handle to it
+            is released. faces holds the font and how many handles it has for each key. """
+        self.faces = dict()
+
+    def Acquire(self, path = FONT, size = 34):
+        key = (os.path.abspath(path), size)
+        if key not in self.faces:
+            font = TTF_OpenFont(key[0].encode('utf-8'), size)
+            if not font:
+                raise RuntimeError(TTF_GetError())
+            self.faces[key] = [font, 0]
+        self.faces[key][1] += 1
+        return FontHandle(self, key, self.faces[key][0])
+
+    def Release(self, key):
+        face = self.faces.get(key)
+        if face is None:
+            return
+        face[1] -= 1
+        if face[1] <= 0:
+            TTF_CloseFont(face[0])
+            del self.faces[key]
+
+    def Close_All(self):
+        """ For shutting down before TTF_Quit, handles released after this do nothing """
+        for key in list(self.faces):
+            TTF_CloseFont(self.faces.pop(key)[0])
+
+    def Open_Count(self):
+        return len(self.faces)
+
+    def File_Bytes(self):
+        """ The size of the font file behind each open face added up. SDL_ttf has no way to
+            ask how much memory a face takes, and that is not this number either way. """
+        return sum(os.path.getsize(key[0]) for key in self.faces)
+
+
 class TextObject:
-    fonts = dict()
+    fonts = FontRegistry()
 
     def __init__(self, renderer, text, width, height,
-                font_name, color = (0, 0, 0), location = (0, 0), font_size = 34):
+                font = FONT, color = (0, 0, 0), location = (0, 0), font_size = 34):
         self.r = renderer
-        if len(font_name) > 1:
-            TextObject.fonts[font_name[0]] = TTF_OpenFont(font_name[1], font_size)
+        self.font = TextObject.fonts.Acquire(font, font_size)
         self.color = SDL_Color(color[0], color[1], color[2])
-        self.surface = TTF_RenderText_Solid(TextObject.fonts[font_name[0]], text.encode('utf-8'), self.color)
+        self.surface = TTF_RenderText_Solid(self.font.font, text.encode('utf-8'), self.color)
         self.message = SDL_CreateTextureFromSurface(self.r, self.surface)
         SDL_FreeSurface(self.surface)
         self.rect = SDL_Rect(location[0], location[1], width, height)
@@ -78,115 +284,247 @@ class TextObject:
         SDL_RenderCopy(self.r, self.message, None, self.rect)
 
     def __del__(self):
-        for keys in list(TextObject.fonts):
-            font = TextObject.fonts.pop(keys, None)
-            if font: TTF_CloseFont(font)
+        self.font.Release()
         SDL_DestroyTexture(self.message)
 
 
+class GlyphAtlas:
+    atlases = dict()
+
+    def __init__(self, renderer, font, characters = ATLAS_CHARACTERS, width = 1024):
+        """ Every character is drawn once (in white) into a single texture, and the rect
+            each one takes up in it is kept, so any text can be drawn as copies out of the
+            texture without making a new one. """
+        self.r = renderer
+        self.glyphs = dict()
+        self.height = TTF_FontHeight(font)
+        self.dest = SDL_Rect()
+        white = SDL_Color(255, 255, 255)
+        surfaces = []
+        x = y = 0
+        for char in characters:
+            surface = TTF_RenderText_Solid(font, char.encode('utf-8'), white)
+            if not surface:
+                continue
+            w = surface.contents.w
+            if x + w > width:
+                x = 0
+                y += self.height
+            self.glyphs[char] = SDL_Rect(x, y, w, surface.contents.h)
+            surfaces.append((surface, SDL_Rect(x, y, w, surface.contents.h)))
+            x += w
+        atlas = SDL_CreateRGBSurface(0, width, y + self.height, 32, 0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000)
+        for surface, rect in surfaces:
+            SDL_BlitSurface(surface, None, atlas, rect)
+            SDL_FreeSurface(surface)
+        self.texture = SDL_CreateTextureFromSurface(self.r, atlas)
+        SDL_FreeSurface(atlas)
+
+    def Size(self, text):
+        width = 0
+        for char in text:
+            if char in self.glyphs:
+                width += self.glyphs[char].w
+        return (width, self.height)
+
+    def Render(self, text, x, y, w = None, h = None, color = (0, 0, 0)):
+        """ Draws the text with its top left corner at (x, y), stretched to w by h if they
+            are given, like a TextObject is stretched to its rect. """
+        width, height = self.Size(text)
+        if not width:
+            return
+        scale_x = w / width if w else 1
+        scale_y = h / height if h else 1
+        SDL_SetTextureColorMod(self.texture, color[0], color[1], color[2])
+        self.dest.y = y
+        self.dest.h = int(height * scale_y)
+        left = 0
+        for char in text:
+            glyph = self.glyphs.get(char)
+            if glyph is None:
+                continue
+            self.dest.x = x + int(left * scale_x)
+            self.dest.w = x + int((left + glyph.w) * scale_x) - self.dest.x
+            SDL_RenderCopy(self.r, self.texture, glyph, self.dest)
+            left += glyph.w
+
+    def Destroy(self):
+        if self.texture:
+            SDL_DestroyTexture(self.texture)
+            self.texture = None
+
+    def __del__(self):
+        self.Destroy()
+
+
+class RectBatch:
+    """ Rects of one color kept side by side in a single SDL_Rect array, so they can be
+        changed in place and all drawn with one SDL_RenderFillRects call. """
+    def __init__(self, renderer, rects, color = (0, 0, 0, 255)):
+        self.r = renderer
+        self.count = len(rects)
+        self.rects = (SDL_Rect * self.count)(*[SDL_Rect(*rect) for rect in rects])
+        self.color = SDL_Color(*color)
+
+    def Set(self, i, x, y, w = None, h = None):
+        rect = self.rects[i]
+        rect.x = x
+        rect.y = y
+        if w is not None:
+            rect.w = w
+        if h is not None:
+            rect.h = h
+
+    def Array(self):
+        """ The rects as a (count, 4) numpy array of x, y, w, h that writes straight into
+            the SDL_Rect array, for changing lots of them at once """
+        return numpy.frombuffer(self.rects, dtype = numpy.int32).reshape(self.count, 4)
+
+    def Render(self):
+        SDL_SetRenderDrawColor(self.r, self.color.r, self.color.g, self.color.b, self.color.a)
+        SDL_RenderFillRects(self.r, self.rects, self.count)
+
+
+class Layer:
+    def __init__(self, renderer, draw, width = WIDTH, height = HEIGHT):
+        """ Things that don't change get drawn once into a target texture by draw(key),
+            and after that the whole layer is a single SDL_RenderCopy. The key says what
+            is in the layer, and the layer is only drawn again when the key changes or it
+            is invalidated. Renderers without target textures just call draw every time. """
+        self.r = renderer
+        self.draw = draw
+        self.width = width
+        self.height = height
+        self.key = None
+        self.texture = None
+        self.valid = False
+        self.cached = bool(SDL_RenderTargetSupported(renderer))
+
+    def Invalidate(self):
+        self.valid = False
+
+    def Update(self, key):
+        if not self.texture:
+            self.texture = SDL_CreateTexture(self.r, SDL_PIXELFORMAT_ARGB8888, SDL_TEXTUREACCESS_TARGET,
+                                             self.width, self.height)
+            if not self.texture:
+                self.cached = False
+                return
+            SDL_SetTextureBlendMode(self.texture, SDL_BLENDMODE_NONE)
+        SDL_SetRenderTarget(self.r, self.texture)
+        self.draw(key)
+        SDL_SetRenderTarget(self.r, None)
+        self.key = key
+        self.valid = True
+
+    def Render(self, key = None):
+        if self.cached and (not self.valid or key != self.key):
+            self.Update(key)
+        if self.cached:
+            SDL_RenderCopy(self.r, self.texture, None, None)
+        else:
+            self.draw(key)
+
+    def Destroy(self):
+        if self.texture:
+            SDL_DestroyTexture(self.texture)
+            self.texture = None
+        self.valid = False
+
+
 class Paddle:
     def __init__(self, renderer, position = (0,0), color = (0,0,0), size = 17):
         self.r = renderer
-        self.head = SDL_Rect(position[0], position[1], size, size)
-        self.body = [None for i in range(7)]
-        self.body[3] = self.head
-        self.direction = None
         self.size = size
-
-        """ This code is for creating the body of the paddle """
-        for i in range(3, 0, -1):
-            self.body[i-1] = SDL_Rect(self.body[i].x, self.body[i].y - size, size, size)
-        for i in range(3, 6):
-            self.body[i+1] = SDL_Rect(self.body[i].x, self.body[i].y + size, size, size)
-
+        self.x = self.last_x = position[0]
+        self.y = self.last_y = position[1]
+        self.box = (position[0], position[1] - size * 3, size, size * 7)
         self.color = SDL_Color(color[0], color[1], color[2], 255)
+        self.batch = RectBatch(renderer, [(0, 0, size, size) for i in range(7)], (color[0], color[1], color[2], 255))
 
         if DEBUG:
-            for i in self.body:
-                print(i)
+            print(self.box)
 
     def Set_Position(self, position):
-        self.body[3].x = position[0]
-        self.body[3].y = position[1]
-        for i in range(3, 0, -1):
-            self.body[i-1].x = self.body[i].x
-            self.body[i-1].y = self.body[i].y - self.size
-        for i in range(3, 6):
-            self.body[i+1].x = self.body[i].x
-            self.body[i+1].y = self.body[i].y + self.size
-
-    def Move(self, direction, speed, movement = True):
-        self.direction = direction
-        if movement:
-            if direction == 'UP':
-                for body in self.body:
-                    body.y -= speed
-            elif direction == 'DOWN':
-                for body in self.body:
-                    body.y += speed
+        self.x = self.last_x = position[0]
+        self.y = self.last_y = position[1]
+        self.Update_Box()
+
+    def Update_Box(self):
+        """ x and y keep the exact (float) position of the middle piece of the paddle,
+            the box that collisions use only gets the whole pixel part of it. """
+        self.box = (int(self.x), int(self.y) - self.size * 3, self.size, self.size * 7)
+
+    def Save(self):
+        self.last_x = self.x
+        self.last_y = self.y
+
+    def Move(self, direction, speed):
+        if direction == 'UP':
+            self.y -= speed
+        elif direction == 'DOWN':
+            self.y += speed
+        self.Update_Box()
 
     def Is_Touching(self, item):
         """ This function returns true or false if the paddle is touching the item. it also
             returns the index of the part of the paddle that touched the item. """
-        for i in range(len(self.body)):
-            if SDL_HasIntersection(self.body[i], item.rect):
-                return (True, i)
-        return (False, -1)
+        return Segment_Hit(self.box, self.size, item.box)
 
-    def Render(self):
-        SDL_SetRenderDrawColor(self.r, self.color.r, self.color.g, self.color.b, self.color.a)
-        for item in self.body:
-            SDL_RenderFillRect(self.r, item)
+    def Render(self, alpha = 1.0):
+        """ alpha is how far the renderer is between the last two simulation steps,
+            so the paddle is drawn in between them. """
+        x = int(self.last_x + (self.x - self.last_x) * alpha)
+        y = int(self.last_y + (self.y - self.last_y) * alpha) - self.size * 3
+        for i in range(self.batch.count):
+            self.batch.Set(i, x, y + self.size * i)
+        self.batch.Render()
 
 
 class Walls:
     def __init__(self, renderer, color = (0,0,0), size = (WIDTH, 20), pos = (0, HEIGHT - 20)):
         self.r = renderer
         self.color = SDL_Color(color[0], color[1], color[2], 255)
-        self.bounds = [SDL_Rect(0, pos[0], size[0], size[1]),
-                       SDL_Rect(0, pos[1], size[0],  size[1])]
+        self.boxes = [(0, pos[0], size[0], size[1]), (0, pos[1], size[0], size[1])]
+        self.batch = RectBatch(renderer, self.boxes, (color[0], color[1], color[2], 255))
 
     def Touching_Paddle(self, paddle):
-        for part in paddle.body:
-            if SDL_HasIntersection(self.bounds[0], part):
-                return (True, 0)
-            elif SDL_HasIntersection(self.bounds[1], part):
-                return (True, 1)
-        return (False, -1)
+        return First_Hit(self.boxes, paddle.box)
 
     def Render(self):
-        SDL_SetRenderDrawColor(self.r, self.color.r, self.color.g, self.color.b, self.color.a)
-        for wall in self.bounds:
-            SDL_RenderFillRect(self.r, wall)
+        self.batch.Render()
 
 
 class Ball:
     def __init__(self, renderer, position = (0,0), size = 20, color = (0, 0, 0)):
         self.r = renderer
-        self.rect = SDL_Rect(position[0], position[1], size, size)
+        self.draw = SDL_Rect(position[0], position[1], size, size)
+        self.box = (position[0], position[1], size, size)
         self.color = SDL_Color(color[0], color[1], color[2], 255)
-        self.x = position[0]
-        self.y = position[1]
+        self.x = self.last_x = position[0]
+        self.y = self.last_y = position[1]
 
     def Set_Position(self, position):
-        self.x = self.rect.x = position[0]
-        self.y = self.rect.y = position[1]
-
-    def Is_Touching_Wall(self, wall):
-        for w in wall.bounds:
-            if SDL_HasIntersection(w, self.rect):
-                return True
-        return False
-
-    def Move(self, degree, speed = 5):
-        self.x += speed * cos(radians(degree))
-        self.y += speed * sin(radians(degree))
-        self.rect.x = int(self.x)
-        self.rect.y = int(self.y)
-
-    def Render(self):
+        self.x = self.last_x = position[0]
+        self.y = self.last_y = position[1]
+        self.box = (position[0], position[1], self.box[2], self.box[3])
+
+    def Save(self):
+        self.last_x = self.x
+        self.last_y = self.y
+
+    def Place(self, x, y):
+        """ Like Set_Position but keeps the exact position, and the ball is still drawn
+            moving from where it was on the last step. """
+        self.x = x
+        self.y = y
+        self.box = (int(x), int(y), self.box[2], self.box[3])
+
+    def Render(self, alpha = 1.0):
         SDL_SetRenderDrawColor(self.r, self.color.r, self.color.g, self.color.b, self.color.a)
-        SDL_RenderFillRect(self.r, self.rect)
+        self.draw.x = int(self.last_x + (self.x - self.last_x) * alpha)
+        self.draw.y = int(self.last_y + (self.y - self.last_y) * alpha)
+        SDL_RenderFillRect(self.r, self.draw)
 
 
 class Clock:
@@ -195,8 +533,6 @@ class Clock:
         self.current_time = SDL_GetPerformanceCounter()
         self.dt = 0
         self.dt_s = 0
-        self.s = 0
-        self.count = 0.0
 
     def Tick(self):
         self.last_time = self.current_time
@@ -207,47 +543,1013 @@ class Clock:
             print('DT SECONDS:', self.dt_s)
             print('DT:', self.dt)
 
-    def Get_Distance(self, speed):
-        """ This function returns the amount of pixels to move by under a constant timestep,
-            no matter how fast the processor actually is on the host computer """
-        return (speed * 100) * self.dt_s
 
-    def Counter(self):
-        self.s += self.dt_s
+class FramePacer:
+    def __init__(self, window, fps = None, vsync = True, spin = 0.002):
+        """ Keeps frames fps apart (the refresh rate of the display by default). It sleeps
+            with SDL_Delay for most of the wait and spins on the performance counter for the
+            last spin seconds, which SDL_Delay is too coarse for. With vsync, presenting
+            already waits for the display, so the pacer only steps in when a frame comes
+            back well before it should, like when the driver ignores vsync. """
+        self.frequency = SDL_GetPerformanceFrequency()
+        self.refresh_rate = Refresh_Rate(window)
+        self.vsync = vsync
+        self.spin = int(spin * self.frequency)
+        self.Set_Target(fps or self.refresh_rate)
+        self.last = SDL_GetPerformanceCounter()
+        self.frames = 0
+        self.missed = 0
+
+    def Set_Target(self, fps):
+        self.fps = fps
+        self.frame = self.frequency // fps
+        self.slack = self.frame // 4 if self.vsync else 0
+
+    def Wait(self):
+        """ Called right after SDL_RenderPresent """
+        self.frames += 1
+        target = self.last + self.frame
+        now = SDL_GetPerformanceCounter()
+        if now > target + self.frame // 2:
+            self.missed += 1
+        if now >= target - self.slack:
+            self.last = now
+            return
+        remaining = target - now
+        if remaining > self.spin:
+            SDL_Delay((remaining - self.spin) * 1000 // self.frequency)
+        while SDL_GetPerformanceCounter() < target:
+            pass
+        self.last = target
+
+    def Reset(self):
+        """ Starts timing from now, after frames were left out on purpose """
+        self.last = SDL_GetPerformanceCounter()
+
+
+class Profiler:
+    phases = ('events', 'logic', 'render', 'present', 'frame')
+
+    def __init__(self, size = 600, bucket = 0.25, buckets = 200, calls = False):
+        """ Times every phase of a frame with the performance counter. The last size
+            samples of each phase are kept in a ring, which the percentiles come from, and
+            every sample also goes into a histogram of bucket millisecond wide buckets.
+            calls also counts and times every call into SDL, frame by frame. """
+        self.frequency = SDL_GetPerformanceFrequency()
+        self.size = size
+        self.bucket = bucket
+        self.samples = dict((phase, [0.0] * size) for phase in Profiler.phases)
+        self.histograms = dict((phase, [0] * buckets) for phase in Profiler.phases)
+        self.index = 0
+        self.frames = 0
+        self.start = self.mark = SDL_GetPerformanceCounter()
+        self.pending = []
+        self.stats = None
+        self.overlay = False
+        """ name: [calls, seconds] over every frame, and the (calls, seconds) of the last one """
+        self.calls = None
+        self.frame_calls = dict()
+        if calls:
+            self.calls = dict()
+            sdl2.dll.instrument()
+            sdl2.dll.reset_call_stats()
+
+    def Begin(self):
+        self.start = self.mark = SDL_GetPerformanceCounter()
+        self.pending = []
+
+    def Add(self, phase, ticks):
+        ms = ticks * 1000.0 / self.frequency
+        self.samples[phase][self.index] = ms
+        histogram = self.histograms[phase]
+        histogram[min(int(ms / self.bucket), len(histogram) - 1)] += 1
+
+    def Mark(self, phase):
+        """ Ends phase, timed from the last mark (or from Begin). It only counts once the
+            frame Ends, so every phase counts the same frames. """
+        now = SDL_GetPerformanceCounter()
+        self.pending.append((phase, now - self.mark))
+        self.mark = now
+
+    def Discard(self):
+        """ Drops the frame so far, for a frame that is skipped before it is drawn """
+        self.pending = []
+        if self.calls is not None:
+            sdl2.dll.reset_call_stats()
+
+    def End(self):
+        for phase, ticks in self.pending:
+            self.Add(phase, ticks)
+        self.pending = []
+        self.Add('frame', self.mark - self.start)
+        self.index = (self.index + 1) % self.size
+        self.frames += 1
+        if self.frames % 30 == 0:
+            self.stats = None
+        if self.calls is not None:
+            self.frame_calls = sdl2.dll.reset_call_stats()
+            for name, (calls, seconds) in self.frame_calls.items():
+                total = self.calls.setdefault(name, [0, 0.0])
+                total[0] += calls
+                total[1] += seconds
+
+    def Percentiles(self, phase):
+        samples = sorted(self.samples[phase][:min(self.frames, self.size)])
+        if not samples:
+            return (0.0, 0.0, 0.0)
+        return tuple(samples[min(len(samples) - 1, int(q * len(samples)))] for q in (0.5, 0.95, 0.99))
+
+    def Report(self, extra = None):
+        report = {'frames': self.frames, 'window': min(self.frames, self.size), 'bucket_ms': self.bucket,
+                  'platform': platform.platform(), 'python': platform.python_version(), 'phases': dict()}
+        for phase in Profiler.phases:
+            p50, p95, p99 = self.Percentiles(phase)
+            report['phases'][phase] = {'p50': p50, 'p95': p95, 'p99': p99, 'histogram': self.histograms[phase]}
+        if self.calls is not None:
+            report['calls'] = dict((name, {'calls': calls, 'per_frame': calls / max(self.frames, 1), 'ms': seconds * 1000,
+                                           'last_frame': self.frame_calls.get(name, (0, 0.0))[0]})
+                                   for name, (calls, seconds) in self.calls.items())
+        if extra:
+            report.update(extra)
+        return report
+
+    def Print_Calls(self, count = 20):
+        """ The functions called most often per frame, with the calls of the last frame """
+        print('%-32s %9s %10s %10s' % ('SDL CALLS', 'PER FRAME', 'LAST FRAME', 'US EACH'))
+        for name, (calls, seconds) in sorted(self.calls.items(), key = lambda item: -item[1][0])[:count]:
+            print('%-32s %9.1f %10d %10.2f' % (name, calls / max(self.frames, 1),
+                                                self.frame_calls.get(name, (0, 0.0))[0], seconds * 1000000 / calls))
+
+    def Dump(self, path, extra = None):
+        with open(path, 'w') as output:
+            json.dump(self.Report(extra), output, indent = 1)
+
+    def Render(self, atlas, x = 24, y = 28, height = 14, color = (105, 105, 105)):
+        """ Draws the percentiles of every phase in milliseconds, the numbers are only
+            worked out again every 30 frames. """
+        if self.stats is None:
+            lines = ['MS        P50   P95   P99']
+            for phase in Profiler.phases:
+                lines.append('%-8s %5.2f %5.2f %5.2f' % ((phase.upper(),) + self.Percentiles(phase)))
+            if self.calls is not None:
+                lines.append('SDL CALLS %d' % sum(calls for calls, seconds in self.frame_calls.values()))
+            self.stats = lines
+        for line in self.stats:
+            atlas.Render(line, x, y, atlas.Size(line)[0] * height // atlas.height, height, color)
+            y += height + 2
+
+
+class Recorder:
+    def __init__(self, hz):
+        """ One byte for every step: the four control keys in the low bits and the
+            ACTION_ flags in the high bits. It is saved zlib compressed, since most steps
+            are the same as the one before. """
+        self.hz = hz
+        self.steps = bytearray()
+
+    def Add(self, controls, actions):
+        self.steps.append(Pack_Input(controls, actions))
+
+    def Save(self, path):
+        with open(path, 'wb') as output:
+            output.write(REPLAY_MAGIC + struct.pack('<HI', self.hz, len(self.steps)))
+            output.write(zlib.compress(bytes(self.steps), 9))
+
+
+class Replay:
+    def __init__(self, path):
+        with open(path, 'rb') as replay:
+            data = replay.read()
+        if data[:len(REPLAY_MAGIC)] != REPLAY_MAGIC:
+            raise ValueError('%s is not a Pong replay' % path)
+        header = len(REPLAY_MAGIC) + struct.calcsize('<HI')
+        self.hz, count = struct.unpack('<HI', data[len(REPLAY_MAGIC):header])
+        self.steps = zlib.decompress(data[header:])
+        if len(self.steps) != count:
+            raise ValueError('%s is cut short' % path)
+        self.index = 0
+
+    def Done(self):
+        return self.index >= len(self.steps)
+
+    def Next(self):
+        """ returns the (controls, actions) of the next step """
+        self.index += 1
+        return Unpack_Input(self.steps[self.index - 1])
+
+
+class Rollback:
+    def __init__(self, renderer, link, player, hz = TICK_RATE, delay = 2, window = 30):
+        """ A network match against whoever is on the other end of link (a netplay Link
+            or Shim), where this side plays player (0 or 1). Both sides run the whole
+            simulation and only send their inputs. The input of the other side is
+            guessed (the keys it last held, no clicks) until it arrives, and if the guess
+            was wrong the simulation goes back to the snapshot from that step and plays
+            forward again. The local input is used delay steps late, which gives it time
+            to get there, and nothing is guessed more than window steps ahead. """
+        self.sim = Simulation(renderer, hz)
+        self.sim.Start()
+        self.link = link
+        self.player = player
+        self.delay = delay
+        self.window = window
+        self.frame = 0
+        self.local = bytearray(delay)
+        self.remote = bytearray()
+        self.early = dict()
+        self.guesses = dict()
+        self.snapshots = dict()
+        self.acked = 0
+        self.remote_frame = 0
+        self.remote_advantage = 0
+        self.owed = 0
+        self.sync_at = 0
+        self.waited = False
+        self.heard = None
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.stalls = 0
+
+    def Poll(self):
+        """ Takes in the packets that have arrived, and plays forward again from the first
+            step that was guessed wrong """
+        for data in self.link.Receive():
+            packet = netplay.Unpack(data)
+            if packet is None:
+                continue
+            first, ack, frame, advantage, inputs = packet
+            self.heard = time.monotonic()
+            self.acked = max(self.acked, ack)
+            if frame >= self.remote_frame:
+                self.remote_frame = frame
+                self.remote_advantage = advantage
+            for i in range(max(0, len(self.remote) - first), len(inputs)):
+                self.early[first + i] = inputs[i]
+        wrong = None
+        while len(self.remote) in self.early:
+            frame = len(self.remote)
+            byte = self.early.pop(frame)
+            self.remote.append(byte)
+            if frame in self.guesses and self.guesses.pop(frame) != byte and wrong is None:
+                wrong = frame
+        if wrong is not None:
+            self.Resimulate(wrong)
+        for frame in [frame for frame in self.snapshots if frame < len(self.remote)]:
+            del self.snapshots[frame]
+
+    def Send(self):
+        self.link.Send(netplay.Pack(self.acked, len(self.remote), self.frame, self.frame - self.remote_frame,
+                                    self.local[self.acked:]))
+
+    def Advance(self, controls, actions = 0):
+        """ controls is (up, down) for the local paddle. returns False if the step had to
+            wait, because the other side is not there yet or is too far behind. """
+        self.Poll()
+        if not self.link.Connected():
+            return False
+        if self.frame - len(self.remote) >= self.window:
+            self.stalls += 1
+            self.Send()
+            return False
+        """ If this side is further ahead of the other than the other is of it, it owes
+            half the difference in waits, taken one step at a time between normal steps
+            so the two meet in the middle. It is not checked again for a round trip, which
+            is how long the waits take to show up in what the other side sends back. """
+        if self.frame >= self.sync_at:
+            ahead = (self.frame - self.remote_frame) - self.remote_advantage
+            if ahead > 2:
+                self.owed = ahead // 2
+            self.sync_at = self.frame + 2 * max(0, self.frame - self.remote_frame) + 10
+        if self.owed and not self.waited:
+            self.owed -= 1
+            self.waited = True
+            self.stalls += 1
+            self.Send()
+            return False
+        self.waited = False
+        self.local.append(Pack_Input(controls, actions))
+        self.Send()
+        self.Step_Frame()
+        return True
+
+    def Step_Frame(self):
+        frame = self.frame
+        self.snapshots[frame] = self.sim.Snapshot()
+        if frame < len(self.remote):
+            remote = self.remote[frame]
+        else:
+            remote = self.remote[-1] & 0x0F if self.remote else 0
+            self.guesses[frame] = remote
+        inputs = (self.local[frame], remote) if self.player == 0 else (remote, self.local[frame])
+        self.sim.Step((bool(inputs[0] & 1), bool(inputs[0] & 2), bool(inputs[1] & 1), bool(inputs[1] & 2)),
+                      (inputs[0] | inputs[1]) & 0xF0)
+        self.frame += 1
+
+    def Resimulate(self, frame):
+        end = self.frame
+        self.sim.Restore(self.snapshots[frame])
+        self.frame = frame
+        while self.frame < end:
+            self.Step_Frame()
+        self.rollbacks += 1
+        self.resimulated += end - frame
+
+    def Timed_Out(self, seconds = 5.0):
+        """ Only counts from the first packet, so joining before the host is up is fine """
+        return self.heard is not None and time.monotonic() - self.heard > seconds
+
+    def Close(self):
+        self.link.Close()
+
+
+class Capture:
+    def __init__(self, renderer, window, stream = None, stills = 'captures', depth = 4, level = 1):
+        """ Copies finished frames out of the renderer with SDL_RenderReadPixels, and a
+            background thread writes them to disk, so the game loop only pays for the copy.
+            Every frame goes into the stream file if there is one, and Still() saves the
+            next frame as a PNG in the stills directory. The frames are copied into a pool
+            of at most depth buffers; when the writer falls behind and they are all in use,
+            frames are dropped instead of making the game wait.
+
+            The stream is CAPTURE_MAGIC, then for every frame a '<IHHI' header (frame
+            number, width, height, size) and that many bytes of zlib compressed RGBA
+            rows, which Read_Capture reads back. """
+        self.r = renderer
+        self.depth = depth
+        self.level = level
+        self.stills = stills
+        self.stream = open(stream, 'wb') if stream else None
+        if self.stream:
+            self.stream.write(CAPTURE_MAGIC)
+        self.size = None
+        """ Reading the frame out in the format of the window itself skips a conversion
+            in SDL, and the writer thread turns the BGRA bytes of the usual formats into
+            RGBA instead. Other windows get RGBA straight from SDL. """
+        format = SDL_GetWindowPixelFormat(window)
+        if sys.byteorder == 'little' and format in (SDL_PIXELFORMAT_ARGB8888, SDL_PIXELFORMAT_RGB888):
+            self.format = format
+        else:
+            self.format = SDL_PIXELFORMAT_RGBA32
+        self.free = collections.deque()
+        self.allocated = 0
+        self.queue = queue.Queue()
+        self.still = False
+        self.frame = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.error = None
+        self.thread = threading.Thread(target = self.Write, name = 'capture', daemon = True)
+        self.thread.start()
+
+    def Still(self):
+        self.still = True
+
+    def Grab(self):
+        """ Called after drawing and before SDL_RenderPresent, while the frame is still
+            in the back buffer """
+        self.frame += 1
+        if not self.stream and not self.still:
+            return
+        w = ctypes.c_int()
+        h = ctypes.c_int()
+        SDL_GetRendererOutputSize(self.r, ctypes.byref(w), ctypes.byref(h))
+        size = (w.value, h.value)
+        if size != self.size:
+            """ buffers of the old size still being written are thrown away when they
+                come back """
+            self.size = size
+            self.free.clear()
+            self.allocated = 0
+        if self.free:
+            buffer = self.free.pop()
+        elif self.allocated < self.depth:
+            buffer = ctypes.create_string_buffer(size[0] * size[1] * 4)
+            self.allocated += 1
+        else:
+            self.dropped += 1
+            return
+        if SDL_RenderReadPixels(self.r, None, self.format, buffer, size[0] * 4) < 0:
+            self.free.append(buffer)
+            self.dropped += 1
+            return
+        self.queue.put((self.frame, size, buffer, self.format, self.still))
+        self.still = False
+        self.captured += 1
+
+    def Write(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            frame, size, buffer, format, still = item
+            pixels = buffer.raw
+            if format != SDL_PIXELFORMAT_RGBA32:
+                pixels = BGRA_To_RGBA(pixels, format == SDL_PIXELFORMAT_ARGB8888)
+            try:
+                if still:
+                    if not os.path.isdir(self.stills):
+                        os.makedirs(self.stills)
+                    with open(os.path.join(self.stills, 'pong-%06d.png' % frame), 'wb') as output:
+                        output.write(Encode_PNG(pixels, size[0], size[1], self.level))
+                if self.stream:
+                    data = zlib.compress(pixels, self.level)
+                    self.stream.write(struct.pack('<IHHI', frame, size[0], size[1], len(data)) + data)
+                self.written += 1
+            except OSError as error:
+                self.error = error
+            if size == self.size:
+                self.free.append(buffer)
+
+    def Close(self):
+        """ Waits for the frames already grabbed to be written """
+        self.queue.put(None)
+        self.thread.join()
+        if self.stream:
+            self.stream.close()
+            self.stream = None
 
 
 class Scoreboard:
-    def __init__(self, renderer, position = (WIDTH // 2 - 2, 0), size = 20, color = (169, 169, 169, 240)):
+    def __init__(self, renderer, position = (WIDTH // 2 - 2, 0), size = 20, color = (169, 169, 169, 240),
+                 font = FONT, font_size = 34):
         self.color = SDL_Color(color[0], color[1], color[2], color[3])
-        self.board = []
         self.r = renderer
+        pieces = []
         y = 0
         """ For creating the actual divider in the middle of the screen """
         while y < HEIGHT - 40:
             y += size * 2
-            self.board.append(SDL_Rect(position[0], y - 20, size, size))
-        self.P1 = []
-        self.P2 = []
-        for i in range(11):
-            if i != 10:
-                self.P1.append(TextObject(renderer, str(i), 50, 70, ['joystix'], location = (position [0] - size * 3 -5, size),
-                                          color = (self.color.r, self.color.g, self.color.b)))
-                self.P2.append(TextObject(renderer, str(i), 50, 70, ['joystix'], location = (position [0] + size * 2, size),
-                                          color = (self.color.r, self.color.g, self.color.b)))
-            else:
-                self.P1.append(TextObject(renderer, str(i), 70, 70, ['joystix'], location = (position [0] - size * 3 -25, size),
-                                          color = (self.color.r, self.color.g, self.color.b)))
-                self.P2.append(TextObject(renderer, str(i), 70, 70, ['joystix'], location=(position[0] + size * 2, size),
-                               color=(self.color.r, self.color.g, self.color.b)))
+            pieces.append((position[0], y - 20, size, size))
+        self.batch = RectBatch(renderer, pieces, color)
+        """ Player 1's score lines up on its right edge and player 2's on its left edge """
+        self.atlas = Get_Atlas(renderer, font, font_size)
+        self.text_color = (self.color.r, self.color.g, self.color.b)
+        self.P1 = position[0] - size * 3 + 45
+        self.P2 = position[0] + size * 2
+        self.top = size
+
+    def Width(self, score):
+        """ One digit is drawn 50 pixels wide, more than that get 35 pixels each """
+        if len(score) == 1:
+            return 50
+        return 35 * len(score)
 
     def Render(self, position = None, b = True):
         if position is not None:
-            self.P1[position[0]].Render()
-            self.P2[position[1]].Render()
+            p1 = str(position[0])
+            p2 = str(position[1])
+            self.atlas.Render(p1, self.P1 - self.Width(p1), self.top, self.Width(p1), 70, self.text_color)
+            self.atlas.Render(p2, self.P2, self.top, self.Width(p2), 70, self.text_color)
         if b:
-            SDL_SetRenderDrawColor(self.r, self.color.r, self.color.g, self.color.b, self.color.a)
-            for piece in self.board:
-                SDL_RenderFillRect(self.r, piece)
+            self.batch.Render()
+
+
+class Simulation:
+    """ The simulation owns everything that moves and the scoring state, and is always
+        advanced by the same fixed timestep (1 / hz seconds) no matter the frame rate. """
+    def __init__(self, renderer, hz = TICK_RATE):
+        self.hz = hz
+        self.dt = 1.0 / hz
+        self.tick = 0
+        self.paddles = [Paddle(renderer, position = (20, 290)), Paddle(renderer, position = (1245, 290))]
+        self.wall = Walls(renderer)
+        self.ball = Ball(renderer, position = (60, 290))
+        self.speed = 6
+        self.ball_speed = 10
+        self.degree = 180
+        self.scores = [0, 0]
+        self.scoring = False
+        self.timer = 0.0
+        self.game = False
+        self.paused = False
+        self.game_over = False
+        self.winner = 0
+
+    def Get_Distance(self, speed):
+        """ The pixels something going at speed (hundreds of pixels a second) moves in one step """
+        return (speed * 100) * self.dt
+
+    def Reset(self):
+        self.scores = [0, 0]
+        self.paddles[0].Set_Position((20, 290))
+        self.paddles[1].Set_Position((1245, 290))
+        self.ball_speed = 10
+        self.game_over = False
+        self.scoring = False
+        self.timer = 0.0
+
+    def Start(self):
+        self.ball.Set_Position((WIDTH // 2, HEIGHT // 2 - 30))
+        self.degree = 1
+        self.game = True
+
+    def Restart(self):
+        self.Reset()
+        self.Start()
+
+    def Back_To_Menu(self):
+        self.Reset()
+        self.ball.Set_Position((60, 290))
+        self.degree = 180
+        self.game = False
+
+    def Toggle_Pause(self):
+        if self.game and not self.game_over:
+            self.paused = not self.paused
+
+    def Apply(self, actions):
+        """ actions is a mix of the ACTION_ flags, which are always done in this order """
+        if actions & ACTION_START:
+            self.Start()
+        if actions & ACTION_RESTART:
+            self.Restart()
+        if actions & ACTION_MENU:
+            self.Back_To_Menu()
+        if actions & ACTION_PAUSE:
+            self.Toggle_Pause()
+
+    def Checksum(self):
+        """ Changes if anything about the state of the match is even slightly different """
+        state = [self.tick, self.degree, self.ball.x, self.ball.y, self.ball_speed, self.timer,
+                 self.paddles[0].y, self.paddles[1].y] + self.scores
+        return hashlib.md5(repr(state).encode('utf-8')).hexdigest()
+
+    def Snapshot(self):
+        """ Everything Step changes, as one flat tuple that Restore can go back to """
+        ball = self.ball
+        state = (self.tick, self.degree, self.ball_speed, self.scores[0], self.scores[1], self.scoring,
+                 self.timer, self.game, self.paused, self.game_over, self.winner,
+                 ball.x, ball.y, ball.last_x, ball.last_y)
+        for paddle in self.paddles:
+            state += (paddle.x, paddle.y, paddle.last_x, paddle.last_y)
+        return state
+
+    def Restore(self, state):
+        (self.tick, self.degree, self.ball_speed, score_1, score_2, self.scoring,
+         self.timer, self.game, self.paused, self.game_over, self.winner) = state[:11]
+        self.scores = [score_1, score_2]
+        ball = self.ball
+        ball.Place(state[11], state[12])
+        ball.last_x, ball.last_y = state[13], state[14]
+        for i in range(2):
+            paddle = self.paddles[i]
+            paddle.x, paddle.y, paddle.last_x, paddle.last_y = state[15 + i * 4:19 + i * 4]
+            paddle.Update_Box()
+
+    def Step(self, controls = (False, False, False, False), actions = 0):
+        """ controls holds the up and down keys of player 1 followed by the up and down
+            keys of player 2, and actions (menu clicks and pausing) are done before the
+            step. Everything that changes the match goes through here, so the same
+            controls and actions from the same start always play out the same. """
+        self.Apply(actions)
+        paddles = self.paddles
+        ball = self.ball
+        for paddle in paddles:
+            paddle.Save()
+        ball.Save()
+        self.tick += 1
+
+        """ Change_Degree only catches a paddle that moved into the ball, everything the
+            ball runs into itself is found by the sweep. """
+        self.degree = Change_Degree(paddles, self.degree, ball)
+        if not self.paused:
+            self.degree = Sweep_Ball(ball, self.degree, self.Get_Distance(self.ball_speed), self.wall, paddles)
+
+        if not self.game:
+            return
+
+        distance = self.Get_Distance(self.speed)
+        for paddle in paddles:
+            result = self.wall.Touching_Paddle(paddle)
+            if result[0]:
+                if result[1] == 0:
+                    paddle.Move('DOWN', distance)
+                else:
+                    paddle.Move('UP', distance)
+
+        if not self.paused and not self.game_over:
+            """ This code is for controlling the paddles """
+            for i in range(2):
+                if controls[i * 2]:
+                    paddles[i].Move('UP', distance)
+                if controls[i * 2 + 1]:
+                    paddles[i].Move('DOWN', distance)
+
+        """ This code is for making sure the ball goes back to the middle
+            after going outta bounds, and for implementing the scoring """
+        if ball.x < - 20 or ball.x > WIDTH + 20:
+            self.ball_speed = 0
+            self.timer += self.dt
+            if not self.scoring:
+                player = 1 if ball.x < - 20 else 0
+                self.scores[player] = min(self.scores[player] + 1, 10)
+                self.scoring = True
+            if self.timer > 2:
+                self.timer = 0.0
+                ball.Set_Position((WIDTH // 2, HEIGHT // 2 - 20))
+                self.ball_speed = 10
+                self.scoring = False
+
+        if self.scores[0] == 10:
+            self.winner = 0
+            self.game_over = True
+        elif self.scores[1] == 10:
+            self.winner = 1
+            self.game_over = True
+
+        if self.game_over:
+            self.paused = False
+            self.ball_speed = 0
+            ball.Set_Position((40, -40))
+
+    def Render(self, alpha = 1.0, walls = True):
+        for paddle in self.paddles:
+            paddle.Render(alpha)
+        if walls:
+            self.wall.Render()
+
+
+class BatchSimulation:
+    """ Plays n matches at once under the same rules as Simulation. The state of every
+        match is kept in numpy arrays, so a single Step() advances all of them. Matches
+        that are over stay frozen until they are restarted. """
+    def __init__(self, n, hz = TICK_RATE, size = 17, ball_size = 20):
+        if numpy is None:
+            raise ImportError('BatchSimulation needs numpy')
+        self.n = n
+        self.bounces = MAX_BOUNCES
+        self.hz = hz
+        self.dt = 1.0 / hz
+        self.tick = 0
+        self.size = size
+        self.ball_size = ball_size
+        self.speed = 6
+        """ DIRECTIONS split into arrays, to look up the heading of every match at once """
+        self.cos = numpy.array([direction[0] for direction in DIRECTIONS])
+        self.sin = numpy.array([direction[1] for direction in DIRECTIONS])
+        self.angles = numpy.array(PADDLE_ANGLES)
+        self.paddle_x = numpy.array([20, 1245])
+        self.paddle_y = numpy.zeros((n, 2))
+        self.ball_x = numpy.zeros(n)
+        self.ball_y = numpy.zeros(n)
+        self.degree = numpy.zeros(n, dtype = numpy.int64)
+        self.ball_speed = numpy.zeros(n)
+        self.scores = numpy.zeros((n, 2), dtype = numpy.int64)
+        self.scoring = numpy.zeros(n, dtype = bool)
+        self.timer = numpy.zeros(n)
+        self.game_over = numpy.zeros(n, dtype = bool)
+        self.winner = numpy.zeros(n, dtype = numpy.int64)
+        self.Restart()
+
+    def Restart(self, matches = None):
+        """ Restarts every match, or only the ones selected by the matches index or mask. """
+        if matches is None:
+            matches = slice(None)
+        self.paddle_y[matches] = 290
+        self.ball_x[matches] = WIDTH // 2
+        self.ball_y[matches] = HEIGHT // 2 - 30
+        self.degree[matches] = 1
+        self.ball_speed[matches] = 10
+        self.scores[matches] = 0
+        self.scoring[matches] = False
+        self.timer[matches] = 0.0
+        self.game_over[matches] = False
+
+    def Axis_Times(self, start, length, delta, target_start, target_length):
+        """ collision.Axis_Times for arrays, with inf and -inf instead of None """
+        forward = delta > 0
+        with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+            entry = numpy.where(forward, target_start - (start + length), target_start + target_length - start) / delta
+            leave = numpy.where(forward, target_start + target_length - start, target_start - (start + length)) / delta
+        still = delta == 0
+        if still.any():
+            overlap = (start < target_start + target_length) & (target_start < start + length)
+            entry[still] = numpy.where(overlap, - numpy.inf, numpy.inf)[still]
+            leave[still] = numpy.where(overlap, numpy.inf, - numpy.inf)[still]
+        return entry, leave
+
+    def Sweep_Balls(self, top):
+        """ Sweep_Ball for every match: each pass finds the first wall or paddle in the
+            way of every ball that is still moving, and bounces it off. """
+        size = self.size
+        b = self.ball_size
+        x = self.ball_x
+        y = self.ball_y
+        distance = (self.ball_speed * 100) * self.dt
+        targets = [(0, 0, WIDTH, 20), (0, HEIGHT - 20, WIDTH, 20),
+                   (self.paddle_x[0], top[:, 0], size, size * 7), (self.paddle_x[1], top[:, 1], size, size * 7)]
+        moving = numpy.flatnonzero(distance > 0)
+        for bounce in range(self.bounces):
+            if not len(moving):
+                break
+            left = distance[moving]
+            degree = self.degree[moving]
+            dx = left * self.cos[degree]
+            dy = left * self.sin[degree]
+            mx = x[moving]
+            my = y[moving]
+            best = numpy.full(len(moving), numpy.inf)
+            axis = numpy.zeros(len(moving), dtype = numpy.int64)
+            which = numpy.full(len(moving), -1)
+            for i in range(len(targets)):
+                tx, ty, tw, th = [value[moving] if isinstance(value, numpy.ndarray) else value
+                                  for value in targets[i]]
+                x_entry, x_exit = self.Axis_Times(mx, b, dx, tx, tw)
+                y_entry, y_exit = self.Axis_Times(my, b, dy, ty, th)
+                entry = numpy.maximum(x_entry, y_entry)
+                hit = (entry < numpy.minimum(x_exit, y_exit)) & (entry >= 0) & (entry <= 1) & (entry < best)
+                best[hit] = entry[hit]
+                axis[hit] = numpy.where(x_entry >= y_entry, 0, 1)[hit]
+                which[hit] = i
+
+            free = which < 0
+            x[moving[free]] = mx[free] + dx[free]
+            y[moving[free]] = my[free] + dy[free]
+            hit = ~free
+            moving = moving[hit]
+            t = best[hit]
+            dx = dx[hit]
+            dy = dy[hit]
+            mx = mx[hit]
+            my = my[hit]
+            axis = axis[hit]
+            which = which[hit]
+
+            """ Put every ball right against the face it hit """
+            face_x = numpy.zeros(len(moving))
+            face_y = numpy.zeros(len(moving))
+            for i in range(len(targets)):
+                mine = which == i
+                tx, ty, tw, th = [value[moving] if isinstance(value, numpy.ndarray) else value
+                                  for value in targets[i]]
+                face_x[mine] = numpy.where(dx > 0, tx - b, tx + tw)[mine]
+                face_y[mine] = numpy.where(dy > 0, ty - b, ty + th)[mine]
+            side = axis == 0
+            x[moving] = numpy.where(side, face_x, mx + dx * t)
+            y[moving] = numpy.where(side, my + dy * t, face_y)
+            distance[moving] *= 1 - t
+
+            wall = which < 2
+            self.degree[moving[wall]] = 360 - self.degree[moving[wall]]
+            for player in range(2):
+                mine = which == player + 2
+                index = numpy.clip((y[moving[mine]].astype(numpy.int64) - top[moving[mine], player]) // size, 0, 6)
+                self.degree[moving[mine]] = self.angles[player][index]
+
+    def Step(self, controls = None):
+        """ controls are four boolean arrays (or anything that broadcasts to n) for the up
+            and down keys of player 1 and then player 2, like Simulation.Step. """
+        size = self.size
+        b = self.ball_size
+        ball_x = self.ball_x
+        ball_y = self.ball_y
+        paddle_y = self.paddle_y
+        self.tick += 1
+
+        """ Change_Degree: a paddle is one box of seven segments, and the segment that got
+            hit is the first one below the top of the ball. """
+        bx = ball_x.astype(numpy.int64)
+        by = ball_y.astype(numpy.int64)
+        top = paddle_y.astype(numpy.int64) - size * 3
+        hit = ((bx[:, None] < self.paddle_x + size) & (self.paddle_x < bx[:, None] + b) &
+               (by[:, None] < top + size * 7) & (top < by[:, None] + b))
+        index = numpy.clip((by[:, None] - top) // size, 0, 6)
+        first = hit[:, 0]
+        second = hit[:, 1] & ~first
+        for player, touched, push in ((0, first, 10), (1, second, -10)):
+            if touched.any():
+                bx[touched] += push
+                ball_x[touched] = bx[touched]
+                ball_y[touched] = by[touched]
+                self.degree[touched] = self.angles[player][index[touched, player]]
+
+        self.Sweep_Balls(top)
+
+        distance = (self.speed * 100) * self.dt
+        top_wall = (top < 20) & (top + size * 7 > 0)
+        bottom_wall = ~top_wall & (top + size * 7 > HEIGHT - 20) & (top < HEIGHT)
+        paddle_y[top_wall] += distance
+        paddle_y[bottom_wall] -= distance
+
+        if controls is not None:
+            live = ~self.game_over
+            for i in range(2):
+                up = numpy.broadcast_to(controls[i * 2], live.shape) & live
+                down = numpy.broadcast_to(controls[i * 2 + 1], live.shape) & live
+                paddle_y[up, i] -= distance
+                paddle_y[down, i] += distance
+
+        out = (ball_x < - 20) | (ball_x > WIDTH + 20)
+        if out.any():
+            self.ball_speed[out] = 0
+            self.timer[out] += self.dt
+            new = out & ~self.scoring
+            left = ball_x < - 20
+            for player, side in ((1, left), (0, ~left)):
+                goal = new & side
+                self.scores[goal, player] = numpy.minimum(self.scores[goal, player] + 1, 10)
+            self.scoring |= new
+            served = out & (self.timer > 2)
+            self.timer[served] = 0.0
+            ball_x[served] = WIDTH // 2
+            ball_y[served] = HEIGHT // 2 - 20
+            self.ball_speed[served] = 10
+            self.scoring[served] = False
+
+        won = self.scores == 10
+        self.winner[won[:, 1]] = 1
+        self.winner[won[:, 0]] = 0
+        self.game_over |= won[:, 0] | won[:, 1]
+        over = self.game_over
+        self.ball_speed[over] = 0
+        ball_x[over] = 40
+        ball_y[over] = -40
+
+
+class SpatialHash:
+    def __init__(self, cell, width = WIDTH, height = HEIGHT):
+        """ A uniform grid of cell pixel squares over width by height, with a border of
+            one cell all round that everything outside the field is squashed into. Build
+            sorts the points by the cell they are in, and after that the points in any
+            run of cells on a row are one slice of the sorted order, found with a binary
+            search. Two boxes no bigger than cell that overlap are always in the same or
+            neighbouring cells. """
+        if numpy is None:
+            raise ImportError('SpatialHash needs numpy')
+        self.cell = cell
+        self.columns = width // cell + 3
+        self.rows = height // cell + 3
+        self.order = numpy.zeros(0, dtype = numpy.int64)
+        self.keys = numpy.zeros(0, dtype = numpy.int64)
+
+    def Cells(self, x, y):
+        column = numpy.clip(numpy.floor_divide(x, self.cell).astype(numpy.int64) + 1, 0, self.columns - 1)
+        row = numpy.clip(numpy.floor_divide(y, self.cell).astype(numpy.int64) + 1, 0, self.rows - 1)
+        return row * self.columns + column
+
+    def Build(self, x, y):
+        keys = self.Cells(x, y)
+        self.order = numpy.argsort(keys, kind = 'stable')
+        self.keys = keys[self.order]
+
+    def Query(self, box):
+        """ returns the index of every point in a cell the box touches """
+        x, y, w, h = box
+        first = self.Cells(numpy.array([x, x + w]), numpy.array([y, y + h]))
+        left = first[0] % self.columns
+        right = first[1] % self.columns
+        found = []
+        for row in range(first[0] // self.columns, first[1] // self.columns + 1):
+            start = numpy.searchsorted(self.keys, row * self.columns + left, 'left')
+            end = numpy.searchsorted(self.keys, row * self.columns + right, 'right')
+            found.append(self.order[start:end])
+        return numpy.concatenate(found)
+
+    def Pairs(self):
+        """ returns two arrays (i, j) holding every pair of points in the same or
+            neighbouring cells, each pair once """
+        keys = self.keys
+        n = len(keys)
+        positions = numpy.arange(n)
+        firsts = []
+        seconds = []
+        """ the same cell (only the points after this one), then the cell to the right and
+            the three cells in the row below """
+        for offset in (0, 1, self.columns - 1, self.columns, self.columns + 1):
+            target = keys + offset
+            start = positions + 1 if offset == 0 else numpy.searchsorted(keys, target, 'left')
+            end = numpy.searchsorted(keys, target, 'right')
+            counts = numpy.maximum(end - start, 0)
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            first = numpy.repeat(positions, counts)
+            second = numpy.repeat(start - numpy.cumsum(counts) + counts, counts) + numpy.arange(total)
+            firsts.append(first)
+            seconds.append(second)
+        if not firsts:
+            return numpy.zeros(0, dtype = numpy.int64), numpy.zeros(0, dtype = numpy.int64)
+        return self.order[numpy.concatenate(firsts)], self.order[numpy.concatenate(seconds)]
+
+
+class Swarm:
+    def __init__(self, renderer, n, size = 10, collide = True, speed = (300, 600), seed = 0, color = (0, 0, 0, 255)):
+        """ n balls of size pixels for stress testing, which bounce off the walls and the
+            paddles (at the same PADDLE_ANGLES as the ball) and, with collide, off each
+            other. Balls that get past a paddle start again from the middle. A
+            SpatialHash finds what each ball could be touching, and all the balls are
+            drawn together with one RectBatch. """
+        if numpy is None:
+            raise ImportError('Swarm needs numpy')
+        self.n = n
+        self.size = size
+        self.collide = collide
+        self.speed = speed
+        self.random = numpy.random.default_rng(seed)
+        self.grid = SpatialHash(max(size, 16))
+        self.directions = numpy.array(DIRECTIONS)
+        self.x = numpy.zeros(n)
+        self.y = numpy.zeros(n)
+        self.vx = numpy.zeros(n)
+        self.vy = numpy.zeros(n)
+        self.Spawn(numpy.ones(n, dtype = bool))
+        self.last_x = self.x.copy()
+        self.last_y = self.y.copy()
+        self.batch = RectBatch(renderer, [(0, 0, size, size)] * n, color)
+        self.rects = self.batch.Array()
+        self.hits = 0
+        self.escaped = 0
+
+    def Spawn(self, balls):
+        count = int(balls.sum())
+        """ headings are kept away from straight up and down, so no ball bounces between
+            the walls for ever """
+        angle = numpy.radians(self.random.uniform(-60, 60, count) + self.random.integers(0, 2, count) * 180)
+        speed = self.random.uniform(self.speed[0], self.speed[1], count)
+        self.x[balls] = WIDTH // 2 + self.random.uniform(-200, 200, count)
+        self.y[balls] = self.random.uniform(40, HEIGHT - 40 - self.size, count)
+        self.vx[balls] = speed * numpy.cos(angle)
+        self.vy[balls] = speed * numpy.sin(angle)
+
+    def Step(self, dt, paddles, wall):
+        size = self.size
+        self.last_x[:] = self.x
+        self.last_y[:] = self.y
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.grid.Build(self.x, self.y)
+        if self.collide:
+            self.Collide()
+
+        """ the walls are straight lines, so every ball is checked against them at once """
+        top = wall.boxes[0][1] + wall.boxes[0][3]
+        bottom = wall.boxes[1][1] - size
+        over = self.y < top
+        self.y[over] = 2 * top - self.y[over]
+        self.vy[over] = numpy.abs(self.vy[over])
+        under = self.y > bottom
+        self.y[under] = 2 * bottom - self.y[under]
+        self.vy[under] = - numpy.abs(self.vy[under])
+
+        out = (self.x < - size) | (self.x > WIDTH)
+        if out.any():
+            self.escaped += int(out.sum())
+            self.Spawn(out)
+            self.last_x[out] = self.x[out]
+            self.last_y[out] = self.y[out]
+
+        for player in range(2):
+            box = paddles[player].box
+            """ the grid is from before the balls were pushed apart, so it is searched a
+                ball wider all round """
+            near = self.grid.Query((box[0] - size, box[1] - size, box[2] + size * 2, box[3] + size * 2))
+            x = self.x[near]
+            y = self.y[near]
+            coming = self.vx[near] < 0 if player == 0 else self.vx[near] > 0
+            hit = near[coming & (x < box[0] + box[2]) & (box[0] < x + size) & (y < box[1] + box[3]) & (box[1] < y + size)]
+            if len(hit) == 0:
+                continue
+            self.hits += len(hit)
+            index = numpy.clip((self.y[hit].astype(numpy.int64) - box[1]) // paddles[player].size, 0, 6)
+            direction = self.directions[numpy.array(PADDLE_ANGLES[player])[index]]
+            speed = numpy.hypot(self.vx[hit], self.vy[hit])
+            self.vx[hit] = speed * direction[:, 0]
+            self.vy[hit] = speed * direction[:, 1]
+            self.x[hit] = box[0] + box[2] if player == 0 else box[0] - size
+
+    def Collide(self):
+        """ Treats the balls as circles of the same weight: two that overlap and are
+            coming together swap their speeds along the line between them, and are each
+            pushed half the overlap apart. """
+        first, second = self.grid.Pairs()
+        dx = self.x[second] - self.x[first]
+        dy = self.y[second] - self.y[first]
+        distance = numpy.hypot(dx, dy)
+        touching = (distance < self.size) & (distance > 0)
+        if not touching.any():
+            return
+        first = first[touching]
+        second = second[touching]
+        distance = distance[touching]
+        nx = dx[touching] / distance
+        ny = dy[touching] / distance
+        closing = (self.vx[second] - self.vx[first]) * nx + (self.vy[second] - self.vy[first]) * ny
+        push = (self.size - distance) / 2
+        numpy.add.at(self.x, first, - nx * push)
+        numpy.add.at(self.y, first, - ny * push)
+        numpy.add.at(self.x, second, nx * push)
+        numpy.add.at(self.y, second, ny * push)
+        closing = numpy.minimum(closing, 0)
+        numpy.add.at(self.vx, first, closing * nx)
+        numpy.add.at(self.vy, first, closing * ny)
+        numpy.add.at(self.vx, second, - closing * nx)
+        numpy.add.at(self.vy, second, - closing * ny)
+
+    def Render(self, alpha = 1.0):
+        self.rects[:, 0] = self.last_x + (self.x - self.last_x) * alpha
+        self.rects[:, 1] = self.last_y + (self.y - self.last_y) * alpha
+        self.batch.Render()
 
 
 # FUNCTIONS_____________________________________________________________________________________________________
@@ -260,6 +1562,105 @@ def WindowState(window, renderer, fs):
         SDL_RenderSetLogicalSize(renderer, WIDTH, HEIGHT)
 
 
+def Refresh_Rate(window, default = 60):
+    """ The refresh rate of the display the window is on, or default if SDL can't tell """
+    mode = SDL_DisplayMode()
+    if SDL_GetCurrentDisplayMode(SDL_GetWindowDisplayIndex(window), ctypes.byref(mode)) < 0:
+        return default
+    return mode.refresh_rate or default
+
+
+def Draw_Playfield(renderer, wall, scoreboard, game, board):
+    """ Everything on the screen that stays put during a match: the background, the
+        walls and the divider in the middle """
+    SDL_SetRenderDrawColor(renderer, 252, 252, 252, 255)
+    SDL_RenderClear(renderer)
+    wall.Render()
+    if game:
+        scoreboard.Render(None, board)
+
+
+def Pack_Input(controls, actions):
+    """ controls is the four keys of both players, or (up, down) for one """
+    byte = actions
+    for i in range(len(controls)):
+        if controls[i]:
+            byte |= 1 << i
+    return byte
+
+
+def Unpack_Input(byte):
+    return (tuple(bool(byte & (1 << i)) for i in range(4)), byte & 0xF0)
+
+
+def Catch_Up(accumulator, dt, step):
+    """ Calls step once for every dt seconds in accumulator and returns the time left over.
+        step returns False when it has to wait (a network match that is too far ahead, or
+        not connected yet), and then no more than one step of time is kept. Keeping all
+        of it would have the waits made up for with a burst of steps right after, so the
+        side that is ahead would never actually slow down. """
+    while accumulator >= dt:
+        if not step():
+            return min(accumulator, dt)
+        accumulator -= dt
+    return accumulator
+
+
+def BGRA_To_RGBA(pixels, alpha = True):
+    """ Swaps the blue and red bytes of every pixel, and makes them all opaque if the
+        pixels had no alpha """
+    rgba = bytearray(pixels)
+    rgba[0::4] = pixels[2::4]
+    rgba[2::4] = pixels[0::4]
+    if not alpha:
+        rgba[3::4] = b'\xff' * (len(pixels) // 4)
+    return rgba
+
+
+def Encode_PNG(pixels, width, height, level = 1):
+    """ A PNG of RGBA rows, made with nothing but zlib """
+    def Chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    stride = width * 4
+    rows = b''.join(b'\x00' + pixels[y * stride:(y + 1) * stride] for y in range(height))
+    return (b'\x89PNG\r\n\x1a\n' + Chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)) +
+            Chunk(b'IDAT', zlib.compress(rows, level)) + Chunk(b'IEND', b''))
+
+
+def Read_Capture(path):
+    """ Goes through a stream saved by Capture, giving (frame, width, height, RGBA rows) """
+    with open(path, 'rb') as stream:
+        if stream.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError('%s is not a Pong capture' % path)
+        header = struct.Struct('<IHHI')
+        while True:
+            data = stream.read(header.size)
+            if len(data) < header.size:
+                break
+            frame, width, height, size = header.unpack(data)
+            yield frame, width, height, zlib.decompress(stream.read(size))
+
+
+def Play_Replay(path):
+    """ Plays a replay with no window, returning the simulation it ended with """
+    replay = Replay(path)
+    sim = Simulation(None, replay.hz)
+    while not replay.Done():
+        controls, actions = replay.Next()
+        sim.Step(controls, actions)
+    return sim
+
+
+def Get_Atlas(renderer, font = FONT, font_size = 34):
+    """ Glyph atlases are only ever built once for each font and size """
+    key = (os.path.abspath(font), font_size)
+    if key not in GlyphAtlas.atlases:
+        handle = TextObject.fonts.Acquire(font, font_size)
+        GlyphAtlas.atlases[key] = GlyphAtlas(renderer, handle.font)
+        handle.Release()
+    return GlyphAtlas.atlases[key]
+
+
 def Deleter(dictionary_list):
     for dictionary in dictionary_list:
         for item in list(dictionary):
@@ -308,8 +1709,276 @@ def Change_Degree(paddles, degree, ball):
     return degree
 
 
+def Sweep_Ball(ball, degree, distance, wall, paddles, bounces = MAX_BOUNCES):
+    """ Moves the ball distance pixels at degree, stopping at the first wall or paddle in
+        its way. It then bounces off it (360 - degree for walls, the angle of the segment
+        that got hit for paddles) and carries on with the rest of the distance, so the
+        ball can never skip through anything however far it moves in one step. After
+        the last bounce allowed, the rest of the distance is dropped. """
+    x = ball.x
+    y = ball.y
+    w = ball.box[2]
+    h = ball.box[3]
+    targets = wall.boxes + [paddle.box for paddle in paddles]
+    for bounce in range(bounces):
+        direction = DIRECTIONS[degree]
+        dx = distance * direction[0]
+        dy = distance * direction[1]
+        hit = None
+        if distance > 0:
+            for i in range(len(targets)):
+                result = Sweep((x, y, w, h), dx, dy, targets[i])
+                if result is not None and (hit is None or result[0] < hit[0]):
+                    hit = (result[0], result[1], i)
+        if hit is None:
+            x += dx
+            y += dy
+            break
+
+        t, axis, i = hit
+        target = targets[i]
+        """ The ball is put right against the face it hit, so it never ends up overlapping """
+        if axis == 0:
+            x = target[0] - w if dx > 0 else target[0] + target[2]
+            y += dy * t
+        else:
+            x += dx * t
+            y = target[1] - h if dy > 0 else target[1] + target[3]
+        distance *= 1 - t
+        if i < len(wall.boxes):
+            degree = 360 - degree
+        else:
+            player = i - len(wall.boxes)
+            index = min(6, max(0, (int(y) - target[1]) // paddles[player].size))
+            degree = PADDLE_ANGLES[player][index]
+    ball.Place(x, y)
+    return degree
+
+
+def Follow_Ball(sim, player):
+    """ A simple controller that keeps the middle of the paddle lined up with the ball. """
+    paddle = sim.paddles[player]
+    ball = sim.ball
+    centre = paddle.y + paddle.size // 2
+    target = ball.y + ball.box[3] // 2
+    return (centre - target > paddle.size, target - centre > paddle.size)
+
+
+def Idle(sim, player):
+    return (False, False)
+
+
+class Script:
+    """ Plays back a list of (up, down) pairs for one paddle, one pair per step. """
+    def __init__(self, moves):
+        self.moves = moves
+
+    def __call__(self, sim, player):
+        return self.moves[sim.tick % len(self.moves)]
+
+
+class Predictor:
+    def __init__(self, reaction = 0.0, error = 0.0, seed = None):
+        """ A computer player that goes to where the ball will cross the column of its
+            paddle, worked out in one go by collision.Intercept. reaction is the part
+            (0 to 1) of the ball's way to that column that goes by before it notices a
+            new heading (until then it keeps going for the old spot), and its guess is
+            off by up to error times the reach of the paddle (half of it plus half of
+            the ball), so anything from 1 up can miss. Bouncing off a wall doesn't change
+            where the ball crosses, so it is not a new heading. There is a plan for each
+            player, so one Predictor can play both sides. """
+        self.reaction = reaction
+        self.error = error
+        self.random = random.Random(seed)
+        self.key = [None, None]
+        self.ready = [0, 0]
+        self.planned = [True, True]
+        self.goal = [HEIGHT // 2, HEIGHT // 2]
+
+    def __call__(self, sim, player):
+        ball = sim.ball
+        paddle = sim.paddles[player]
+        w = ball.box[2]
+        h = ball.box[3]
+        column = paddle.box[0] + paddle.box[2] if player == 0 else paddle.box[0] - w
+        key = (min(sim.degree, 360 - sim.degree), sim.ball_speed)
+        if key != self.key[player]:
+            self.key[player] = key
+            self.planned[player] = False
+            """ the steps the ball takes to get to the column, 0 if it never does """
+            dx = DIRECTIONS[sim.degree][0] * sim.Get_Distance(sim.ball_speed)
+            steps = (column - ball.x) / dx if dx else 0
+            self.ready[player] = sim.tick + self.reaction * max(0, steps)
+        if not self.planned[player] and sim.tick >= self.ready[player]:
+            self.planned[player] = True
+            walls = sim.wall.boxes
+            y = Intercept(ball.x, ball.y, sim.degree, column, walls[0][1] + walls[0][3], walls[1][1] - h)
+            if y is None:
+                self.goal[player] = HEIGHT // 2
+            else:
+                reach = (paddle.box[3] + h) / 2
+                self.goal[player] = y + h / 2 + self.random.uniform(- self.error, self.error) * reach
+        centre = paddle.y + paddle.size // 2
+        goal = self.goal[player]
+        return (centre - goal > paddle.size // 2, goal - centre > paddle.size // 2)
+
+
+""" Each run makes its own controllers from the name of a difficulty, since a Predictor
+    keeps its plans """
+CONTROLLERS = {'follow': lambda difficulty: Follow_Ball, 'idle': lambda difficulty: Idle,
+               'predict': lambda difficulty: Predictor(*DIFFICULTIES[difficulty])}
+
+
+def Batch_Follow_Ball(batch, player):
+    """ Follow_Ball for every match of a BatchSimulation """
+    centre = batch.paddle_y[:, player] + batch.size // 2
+    target = batch.ball_y + batch.ball_size // 2
+    return (centre - target > batch.size, target - centre > batch.size)
+
+
+def Batch_Idle(batch, player):
+    return (False, False)
+
+
+class Batch_Predictor:
+    def __init__(self, reaction = 0.0, error = 0.0, seed = None):
+        """ Predictor for every match of a BatchSimulation. With no error it makes the
+            same moves as Predictor. """
+        self.reaction = reaction
+        self.error = error
+        self.seed = seed
+        self.n = None
+
+    def Setup(self, n):
+        self.n = n
+        self.random = numpy.random.default_rng(self.seed)
+        self.degree = numpy.full((n, 2), -1, dtype = numpy.int64)
+        self.speed = numpy.full((n, 2), -1.0)
+        self.ready = numpy.zeros((n, 2))
+        self.planned = numpy.ones((n, 2), dtype = bool)
+        self.goal = numpy.full((n, 2), float(HEIGHT // 2))
+
+    def __call__(self, batch, player):
+        if self.n != batch.n:
+            self.Setup(batch.n)
+        column = batch.paddle_x[0] + batch.size if player == 0 else batch.paddle_x[1] - batch.ball_size
+        degree = numpy.minimum(batch.degree, 360 - batch.degree)
+        changed = (degree != self.degree[:, player]) | (batch.ball_speed != self.speed[:, player])
+        self.degree[:, player] = degree
+        self.speed[:, player] = batch.ball_speed
+        if changed.any():
+            dx = batch.cos[batch.degree[changed]] * ((batch.ball_speed[changed] * 100) * batch.dt)
+            with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+                steps = numpy.where(dx != 0, (column - batch.ball_x[changed]) / dx, 0)
+            self.ready[changed, player] = batch.tick + self.reaction * numpy.maximum(0, steps)
+            self.planned[changed, player] = False
+        ready = ~self.planned[:, player] & (batch.tick >= self.ready[:, player])
+        if ready.any():
+            self.planned[ready, player] = True
+            x = batch.ball_x[ready]
+            y = batch.ball_y[ready]
+            degree = batch.degree[ready]
+            dx = batch.cos[degree]
+            top = 20
+            span = HEIGHT - 20 - batch.ball_size - top
+            away = ((column - x) * dx < 0) | ((numpy.abs(dx) < 1e-9) & (column != x))
+            with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+                y = numpy.where(column != x, y + batch.sin[degree] * (column - x) / dx, y)
+            y = numpy.mod(y - top, 2 * span)
+            y = top + numpy.where(y <= span, y, 2 * span - y)
+            if self.error:
+                reach = (batch.size * 7 + batch.ball_size) / 2
+                y = y + self.random.uniform(- self.error, self.error, len(y)) * reach
+            self.goal[ready, player] = numpy.where(away, HEIGHT // 2, y + batch.ball_size / 2)
+        centre = batch.paddle_y[:, player] + batch.size // 2
+        goal = self.goal[:, player]
+        return (centre - goal > batch.size // 2, goal - centre > batch.size // 2)
+
+
+BATCH_CONTROLLERS = {'follow': lambda difficulty: Batch_Follow_Ball, 'idle': lambda difficulty: Batch_Idle,
+                     'predict': lambda difficulty: Batch_Predictor(*DIFFICULTIES[difficulty])}
+
+
+def Headless(matches = 1, hz = TICK_RATE, controllers = (Follow_Ball, Follow_Ball), max_ticks = MAX_TICKS):
+    """ Plays whole matches with no window, renderer or fonts, as fast as the CPU allows.
+        Each paddle is driven by a controller(sim, player) that returns (up, down), and
+        the result of every match is returned as (scores, ticks). max_ticks stops
+        matches that would never end, like Follow_Ball against itself (which is why
+        it has a limit by default), and None plays on until someone wins. """
+    sim = Simulation(None, hz)
+    results = []
+    for match in range(matches):
+        sim.Restart()
+        start = sim.tick
+        while not sim.game_over:
+            if max_ticks is not None and sim.tick - start >= max_ticks:
+                break
+            sim.Step(controllers[0](sim, 0) + controllers[1](sim, 1))
+        results.append((tuple(sim.scores), sim.tick - start))
+    return results
+
+
+def Batch_Headless(matches = 1, hz = TICK_RATE, controllers = (Batch_Follow_Ball, Batch_Follow_Ball),
+                   max_ticks = MAX_TICKS):
+    """ Headless for a BatchSimulation: every match is played at the same time, and the
+        results come back in the same (scores, ticks) form. """
+    batch = BatchSimulation(matches, hz)
+    ticks = numpy.zeros(matches, dtype = numpy.int64)
+    while not batch.game_over.all():
+        if max_ticks is not None and batch.tick >= max_ticks:
+            break
+        ticks += ~batch.game_over
+        batch.Step(controllers[0](batch, 0) + controllers[1](batch, 1))
+    return [(tuple(int(score) for score in batch.scores[i]), int(ticks[i])) for i in range(matches)]
+
+
+def Net_Headless(ticks = 3000, hz = TICK_RATE, latency = 0.1, jitter = 0.0, loss = 0.0, seed = 0,
+                 controllers = (Follow_Ball, Follow_Ball)):
+    """ Plays a network match between two Rollback sessions over localhost, both going
+        through a Shim with the same latency, jitter and loss, on a fake clock that moves
+        one step per loop so it runs as fast as it can. Once both have played ticks steps
+        and have every input, their simulations should be the same, and both sessions are
+        returned to be checked. """
+    now = [0.0]
+    clock = lambda: now[0]
+    host = netplay.Link(address = '127.0.0.1')
+    guest = netplay.Link(peer = host.address, address = '127.0.0.1')
+    sessions = [Rollback(None, netplay.Shim(host, latency, jitter, loss, seed, clock), 0, hz),
+                Rollback(None, netplay.Shim(guest, latency, jitter, loss, seed + 1, clock), 1, hz)]
+    """ the host only learns where the guest is from its first packet """
+    sessions[1].Send()
+    while min(len(session.remote) for session in sessions) < ticks:
+        now[0] += 1.0 / hz
+        for session in sessions:
+            if session.frame < ticks:
+                session.Advance(controllers[session.player](session.sim, session.player))
+            else:
+                session.Poll()
+                session.Send()
+        if now[0] > ticks * 10.0 / hz:
+            raise RuntimeError('the network match stopped getting anywhere')
+    for session in sessions:
+        session.Poll()
+        session.Close()
+    return sessions
+
+
+def Swarm_Headless(n, ticks = 1200, hz = TICK_RATE, collide = True):
+    """ The multi-ball load test without a window: a match between two Follow_Ball
+        players with a Swarm of n balls, returning the Swarm and the seconds it took """
+    sim = Simulation(None, hz)
+    sim.Start()
+    swarm = Swarm(None, n, collide = collide)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        sim.Step(Follow_Ball(sim, 0) + Follow_Ball(sim, 1))
+        swarm.Step(sim.dt, sim.paddles, sim.wall)
+    return swarm, time.perf_counter() - start
+
+
 # MAIN__________________________________________________________________________________________________________
-def main():
+def main(hz = TICK_RATE, fps = None, profile = None, record = None, replay = None, link = None, player = 0,
+         cpu = None, difficulty = 'normal', balls = 0, collide = True, capture = None, calls = False):
     if (TTF_Init() < 0):
         print(TTF_GetError())
         return -1
@@ -320,90 +1989,159 @@ def main():
 
     window = SDL_CreateWindow(b"Pong Classic - By Isa Bolling", SDL_WINDOWPOS_UNDEFINED,
                             SDL_WINDOWPOS_UNDEFINED, WIDTH, HEIGHT, SDL_WINDOW_SHOWN)
-    renderer = SDL_CreateRenderer(window, -1, SDL_RENDERER_PRESENTVSYNC)
-    event = SDL_Event()
+    """ Picking a frame rate turns vsync off, so the frame pacer alone sets the pace """
+    renderer = SDL_CreateRenderer(window, -1, 0 if fps else SDL_RENDERER_PRESENTVSYNC)
 
     # Variables_________________________________________________________________________________________________
     running = True
-    menu = True
-    game = False
+    actions = 0
     fullscreen = False
-    paused = False
-    speed = 6
-    ball_speed = 10
-    degree = 180
-    player_1_score = 0
-    player_2_score = 0
-    scoring = False
-    game_over = False
-    winner = 0
-    board = True
+    hidden = False
+    accumulator = 0.0
 
     # Objects___________________________________________________________________________________________________
     mouse = Pointer()
     menu_items = {
-    'Title':       TextObject(renderer, 'Pong Classic', 600, 240, ['joystix', b'font/joystix.ttf'], location = (345, 0)),
-    'Start':       TextObject(renderer, 'Start', 100, 85, ['joystix'], location = (583, 350)),
-    'Fullscreen':  TextObject(renderer, 'Fullscreen', 200, 85, ['joystix'], location = (543, 450)),
-    'Quit':        TextObject(renderer, 'Quit', 90, 85, ['joystix'], location = (590, 550))
+    'Title':       TextObject(renderer, 'Pong Classic', 600, 240, location = (345, 0)),
+    'Start':       TextObject(renderer, 'Start', 100, 85, location = (583, 350)),
+    'Fullscreen':  TextObject(renderer, 'Fullscreen', 200, 85, location = (543, 450)),
+    'Quit':        TextObject(renderer, 'Quit', 90, 85, location = (590, 550))
     }
-    paddles = [Paddle(renderer, position = (20, 290)), Paddle(renderer, position = (1245, 290))]
-    wall = Walls(renderer)
-    ball = Ball(renderer, position = (60, 290))
+    """ A replay drives the simulation by itself, and the controls and clicks are
+        ignored until it ends """
+    replay = Replay(replay) if replay else None
+    recorder = Recorder(hz) if record else None
+    """ With a link the match is played over the network, see Rollback """
+    session = Rollback(renderer, link, player, hz) if link else None
+    sim = session.sim if session else Simulation(renderer, replay.hz if replay else hz)
+    """ cpu is the player (0 or 1) the computer plays, if any """
+    computer = Predictor(*DIFFICULTIES[difficulty]) if cpu is not None else None
+    swarm = Swarm(renderer, balls, collide = collide) if balls else None
+    """ F12 saves a screenshot, and capture is a file to stream every frame to """
+    capturer = Capture(renderer, window, capture)
     clock = Clock()
+    pacer = FramePacer(window, fps, vsync = not fps)
+    profiler = Profiler(calls = calls)
     scoreboard = Scoreboard(renderer)
+    playfield = Layer(renderer, lambda key: Draw_Playfield(renderer, sim.wall, scoreboard, key[0], key[1]))
     winner_text = [
-        TextObject(renderer, 'Player 1 Wins', 900, 340, ['joystix'], location = (210, 40), color = (105, 105, 105)),
-        TextObject(renderer, 'Player 2 Wins', 900, 340, ['joystix'], location = (210, 40), color = (105, 105, 105))]
+        TextObject(renderer, 'Player 1 Wins', 900, 340, location = (210, 40), color = (105, 105, 105)),
+        TextObject(renderer, 'Player 2 Wins', 900, 340, location = (210, 40), color = (105, 105, 105))]
     game_items = {
-    'Paused':     TextObject(renderer, 'Paused', 400, 240, ['joystix'], location = (450, 200), color = (105, 105, 105)),
-    'Restart':    TextObject(renderer, 'Restart', 120, 85, ['joystix'], location = (450, 350), color = (105, 105, 105)),
-    'Menu':       TextObject(renderer, 'Menu', 90, 85, ['joystix'], location = (720, 350), color = (105, 105, 105))
+    'Paused':     TextObject(renderer, 'Paused', 400, 240, location = (450, 200), color = (105, 105, 105)),
+    'Restart':    TextObject(renderer, 'Restart', 120, 85, location = (450, 350), color = (105, 105, 105)),
+    'Menu':       TextObject(renderer, 'Menu', 90, 85, location = (720, 350), color = (105, 105, 105))
     }
 
+    # Events____________________________________________________________________________________________________
+    def Quit(event):
+        nonlocal running
+        running = False
+
+    def Reset(event):
+        playfield.Invalidate()
+
+    def Window(event):
+        nonlocal hidden
+        if(event.window.event == SDL_WINDOWEVENT_SIZE_CHANGED):
+            playfield.Invalidate()
+        elif(event.window.event in (SDL_WINDOWEVENT_MINIMIZED, SDL_WINDOWEVENT_HIDDEN)):
+            hidden = True
+        elif(event.window.event in (SDL_WINDOWEVENT_RESTORED, SDL_WINDOWEVENT_SHOWN,
+                                    SDL_WINDOWEVENT_EXPOSED, SDL_WINDOWEVENT_MAXIMIZED)):
+            hidden = False
+
+    def Key(event):
+        nonlocal actions
+        if (event.key.keysym.scancode == SDL_SCANCODE_P):
+            actions ^= ACTION_PAUSE
+        if (event.key.keysym.scancode == SDL_SCANCODE_F3):
+            profiler.overlay = not profiler.overlay
+        if (event.key.keysym.scancode == SDL_SCANCODE_F12):
+            capturer.Still()
+
+    pump = EventPump()
+    pump.On(SDL_QUIT, Quit)
+    pump.On(SDL_RENDER_TARGETS_RESET, Reset)
+    pump.On(SDL_RENDER_DEVICE_RESET, Reset)
+    def Still():
+        """ True when nothing on the screen moves by itself """
+        return (sim.paused or hidden or (sim.game_over and swarm is None)) and session is None
+
+    def Step():
+        """ One step of whatever drives the simulation, returns False if it has to wait """
+        nonlocal actions, running
+        if session is not None:
+            local = (keystate[SDL_SCANCODE_W] or keystate[SDL_SCANCODE_UP],
+                     keystate[SDL_SCANCODE_S] or keystate[SDL_SCANCODE_DOWN])
+            if not session.Advance(local, actions):
+                return False
+            actions = 0
+        elif replay is not None:
+            if replay.Done():
+                running = False
+                return False
+            sim.Step(*replay.Next())
+        else:
+            step = controls
+            if computer is not None:
+                step = computer(sim, cpu) + controls[2:] if cpu == 0 else controls[:2] + computer(sim, cpu)
+            if recorder is not None:
+                recorder.Add(step, actions)
+            sim.Step(step, actions)
+            actions = 0
+        if swarm is not None and not sim.paused:
+            swarm.Step(sim.dt, sim.paddles, sim.wall)
+        return True
+
+    pump.On(SDL_WINDOWEVENT, Window)
+    pump.On(SDL_KEYDOWN, Key)
+    pump.On(SDL_MOUSEMOTION, mouse.Motion)
+    pump.On(SDL_MOUSEBUTTONDOWN, mouse.Button)
+
     # Game Loop_________________________________________________________________________________________________
     while (running):
+        """ Nothing moves on the pause screen, the game over screen (unless there are
+            extra balls) or in a window nobody can see, so the loop sleeps until an event
+            comes in (or IDLE_TIMEOUT ms pass), and the frame is only drawn again if there
+            was an event. The time spent asleep is dropped, so unpausing doesn't turn it
+            into a burst of steps, and the loop stays awake until pending actions are
+            stepped. """
+        idle = Still() and not actions
+        if idle:
+            SDL_WaitEventTimeout(None, IDLE_TIMEOUT)
+            clock.Tick()
+        profiler.Begin()
         keystate = SDL_GetKeyboardState(None)
         clock.Tick()
 
         # Event Loop___________________________________________________________
-        while(SDL_PollEvent(ctypes.byref(event))):
-            mouse.Compute(event)
-            if(event.type == SDL_QUIT):
-                running = False
-                break
-            if game and not game_over:
-                if(event.type == SDL_KEYDOWN):
-                    if (event.key.keysym.scancode == SDL_SCANCODE_P):
-                        if not paused:
-                            paused = True
-                            board = False
-                        else:
-                            paused = False
-                            board = True
+        mouse.Begin()
+        pump.Pump()
+        if not running:
+            break
 
         if keystate[SDL_SCANCODE_ESCAPE]:
             running = False
             break
+        profiler.Mark('events')
 
         # Logic________________________________________________________________
-        degree = Change_Degree(paddles, degree, ball)
-        if not paused:
-            if ball.Is_Touching_Wall(wall):
-                degree = 360-degree
-            ball.Move(degree, int(clock.Get_Distance(ball_speed)))
-
-        if (menu):
-            for item in menu_items:
-                if item == 'Title':
-                    pass
-                else:
-                    if mouse.Is_Touching(menu_items[item]):
-                        menu_items[item].highlight = True
-                        mouse.Set_Cursor(SDL_SYSTEM_CURSOR_HAND)
-                    else:
-                        menu_items[item].highlight = False
-
+        """ The simulation catches up with the time that has passed in fixed steps, and
+            whatever is left over is used to draw in between the last two steps. """
+        controls = (keystate[SDL_SCANCODE_W], keystate[SDL_SCANCODE_S],
+                    keystate[SDL_SCANCODE_UP], keystate[SDL_SCANCODE_DOWN])
+        accumulator = Catch_Up(accumulator + min(clock.dt_s, MAX_FRAME_TIME), sim.dt, Step)
+        alpha = accumulator / sim.dt
+
+        if (not sim.game):
+            mouse.Hover(menu_items, ignore = ('Title',), layout = fullscreen)
+        elif (sim.game_over):
+            mouse.Hover(game_items, ignore = ('Paused',))
+        else:
+            mouse.Hover(None)
+
+        if (not sim.game):
             if mouse.Is_Clicking(menu_items['Quit']):
                 running = False
                 break
@@ -415,135 +2153,93 @@ def main():
                 else:
                     fullscreen = False
                     WindowState(window, renderer, fullscreen)
+                playfield.Invalidate()
 
             if mouse.Is_Clicking(menu_items['Start']):
-                ball.Set_Position((WIDTH // 2, HEIGHT // 2 - 30))
-                degree = 1
-                menu = False
-                game = True
-
-        if (game):
-            for paddle in paddles:
-                result = wall.Touching_Paddle(paddle)
-                if result[0]:
-                    if result[1] == 0:
-                        paddle.Move('DOWN', int(clock.Get_Distance(speed)))
-                    else:
-                        paddle.Move('UP', int(clock.Get_Distance(speed)))
-
-            if not paused and not game_over:
-                """ This code is for controlling the first paddle """
-                if keystate[SDL_SCANCODE_W]:
-                    paddles[0].Move('UP', int(clock.Get_Distance(speed)))
-                if keystate[SDL_SCANCODE_S]:
-                    paddles[0].Move('DOWN', int(clock.Get_Distance(speed)))
-                """ This code is for controlling the second paddle """
-                if keystate[SDL_SCANCODE_UP]:
-                    paddles[1].Move('UP', int(clock.Get_Distance(speed)))
-                if keystate[SDL_SCANCODE_DOWN]:
-                    paddles[1].Move('DOWN', int(clock.Get_Distance(speed)))
-
-            """ This code is for making sure the ball goes back to the middle
-                after going outta bounds, and for implementing the scoring """
-            if ball.x < - 20 or ball.x > WIDTH + 20:
-                ball_speed = 0
-                clock.Counter()
-                if not scoring:
-                    if ball.x < - 20:
-                        player_2_score += 1
-                        if player_2_score > 10:
-                            player_2_score = 10
-                        scoring = True
-                    else:
-                        player_1_score += 1
-                        if player_1_score > 10:
-                            player_1_score = 10
-                        scoring = True
-                if clock.s > 2:
-                    clock.s = 0
-                    ball.Set_Position((WIDTH // 2, HEIGHT // 2 - 20))
-                    ball_speed = 10
-                    scoring = False
-
-            if player_1_score == 10:
-                winner = 0
-                game_over = True
-            elif player_2_score == 10:
-                winner = 1
-                game_over = True
-
-            if (game_over):
-                paused = False
-                board = False
-                ball_speed = 0
-                ball.Set_Position((40, -40))
-                for item in game_items:
-                    if item == 'Paused':
-                        pass
-                    else:
-                        if mouse.Is_Touching(game_items[item]):
-                            game_items[item].highlight = True
-                            mouse.Set_Cursor(SDL_SYSTEM_CURSOR_HAND)
-                        else:
-                            game_items[item].highlight = False
-
-                if mouse.Is_Clicking(game_items['Restart']):
-                    player_1_score = 0
-                    player_2_score = 0
-                    ball.Set_Position((WIDTH // 2, HEIGHT // 2 - 30))
-                    paddles[0].Set_Position((20, 290))
-                    paddles[1].Set_Position((1245, 290))
-                    degree = 1
-                    ball_speed = 10
-                    game_over = False
-                    scoring = False
-                    board = True
-
-                if mouse.Is_Clicking(game_items['Menu']):
-                    player_1_score = 0
-                    player_2_score = 0
-                    ball.Set_Position((60, 290))
-                    degree = 180
-                    paddles[0].Set_Position((20, 290))
-                    paddles[1].Set_Position((1245, 290))
-                    ball_speed = 10
-                    game_over = False
-                    scoring = False
-                    board = True
-                    game = False
-                    menu = True
+                actions |= ACTION_START
 
-        # Rendering____________________________________________________________
-        SDL_SetRenderDrawColor(renderer, 252, 252, 252, 255)
-        SDL_RenderClear(renderer)
+        if (sim.game_over):
+            if mouse.Is_Clicking(game_items['Restart']):
+                actions |= ACTION_RESTART
 
-        for paddle in paddles:
-            paddle.Render()
-        wall.Render()
+            if mouse.Is_Clicking(game_items['Menu']):
+                if session is not None:
+                    running = False
+                    break
+                actions |= ACTION_MENU
+
+        if session is not None and session.Timed_Out():
+            print('Lost the connection to the other player')
+            running = False
+            break
+        profiler.Mark('logic')
+        if idle and Still() and pump.count == 0:
+            pacer.Reset()
+            profiler.Discard()
+            continue
+
+        # Rendering____________________________________________________________
+        playfield.Render((sim.game, not sim.paused and not sim.game_over))
+        sim.Render(alpha, walls = False)
 
-        if (menu):
+        if (not sim.game):
             for item in menu_items:
                 menu_items[item].Render()
 
-        if (game):
-            scoreboard.Render((player_1_score, player_2_score), board)
-            
-        ball.Render()
-        
-        if (game_over):
-            winner_text[winner].Render()
+        if (sim.game):
+            scoreboard.Render(sim.scores, False)
+
+        sim.ball.Render(alpha)
+        if swarm is not None:
+            swarm.Render(alpha)
+
+        if (sim.game_over):
+            winner_text[sim.winner].Render()
             for item in game_items:
                 if item == 'Paused':
                     pass
                 else:
                     game_items[item].Render()
-        if (paused):
+        if (sim.paused):
             game_items['Paused'].Render()
 
-        SDL_RenderPresent(renderer)
-        SDL_Delay(10)
+        if profiler.overlay:
+            profiler.Render(scoreboard.atlas)
+        capturer.Grab()
+        profiler.Mark('render')
 
-    Deleter([menu_items, game_items])
+        SDL_RenderPresent(renderer)
+        pacer.Wait()
+        profiler.Mark('present')
+        profiler.End()
+
+    if recorder is not None:
+        recorder.Save(record)
+    capturer.Close()
+    if DEBUG or capture:
+        print('CAPTURED:', capturer.captured, 'DROPPED:', capturer.dropped, 'WRITTEN:', capturer.written)
+    if capturer.error:
+        print('Could not save the capture:', capturer.error)
+    if session is not None:
+        if DEBUG:
+            print('ROLLBACKS:', session.rollbacks, 'RESIMULATED:', session.resimulated, 'STALLS:', session.stalls)
+        session.Close()
+    if calls:
+        profiler.Print_Calls()
+    if profile:
+        info = SDL_RendererInfo()
+        SDL_GetRendererInfo(renderer, ctypes.byref(info))
+        profiler.Dump(profile, {'renderer': info.name.decode('utf-8'), 'refresh_rate': pacer.refresh_rate,
+                                'target_fps': pacer.fps, 'missed': pacer.missed, 'hz': hz})
+    playfield.Destroy()
+    for atlas in GlyphAtlas.atlases.values():
+        atlas.Destroy()
+    Deleter([menu_items, game_items, GlyphAtlas.atlases])
+    if DEBUG:
+        print('FRAMES:', pacer.frames, 'MISSED:', pacer.missed, 'TARGET FPS:', pacer.fps)
+        print('FONTS OPEN:', TextObject.fonts.Open_Count())
+        print('FONT FILE BYTES:', TextObject.fonts.File_Bytes())
+    TextObject.fonts.Close_All()
     SDL_DestroyRenderer(renderer)
     SDL_DestroyWindow(window)
     SDL_Quit()
@@ -551,4 +2247,86 @@ def main():
     return 0
 
 
-main()
+def Arguments(argv = None):
+    parser = argparse.ArgumentParser(description = 'Pong Classic')
+    parser.add_argument('--hz', type = int, default = TICK_RATE, help = 'simulation steps per second')
+    parser.add_argument('--fps', type = int, default = None, help = 'frame rate to run at without vsync')
+    parser.add_argument('--profile', default = None, help = 'write frame timings to this JSON file on exit')
+    parser.add_argument('--calls', action = 'store_true', help = 'count the calls into SDL every frame and list them on exit')
+    parser.add_argument('--record', default = None, help = 'save every step of input to this file')
+    parser.add_argument('--replay', default = None, help = 'play back a file saved with --record')
+    parser.add_argument('--host', type = int, default = None, metavar = 'PORT', help = 'host a network match on this port')
+    parser.add_argument('--join', default = None, metavar = 'HOST:PORT', help = 'join a network match')
+    parser.add_argument('--latency', type = float, default = 0.0, help = 'add this many ms to every packet sent')
+    parser.add_argument('--jitter', type = float, default = 0.0, help = 'add up to this many more ms to every packet sent')
+    parser.add_argument('--loss', type = float, default = 0.0, help = 'drop this fraction (0 to 1) of the packets sent')
+    parser.add_argument('--netplay', action = 'store_true', help = 'with --headless, play a network match over localhost')
+    parser.add_argument('--cpu', type = int, choices = (1, 2), default = None, help = 'let the computer play this player')
+    parser.add_argument('--difficulty', choices = sorted(DIFFICULTIES), default = 'normal', help = 'how well the computer plays')
+    parser.add_argument('--balls', type = int, default = 0, help = 'add this many extra balls, as a load test')
+    parser.add_argument('--no-ball-collisions', action = 'store_true', help = 'let the extra balls pass through each other')
+    parser.add_argument('--capture', default = None, help = 'save every frame to this file')
+    parser.add_argument('--headless', action = 'store_true', help = 'play matches without a window')
+    parser.add_argument('--matches', type = int, default = 1, help = 'number of headless matches')
+    parser.add_argument('--batch', action = 'store_true', help = 'play the headless matches all at once with numpy')
+    parser.add_argument('--max-ticks', type = int, default = None, help = 'give up on a headless match after this many steps (default %d, 3000 with --netplay, 1200 with --balls)' % MAX_TICKS)
+    parser.add_argument('--p1', choices = sorted(CONTROLLERS), default = 'follow', help = 'headless controller for player 1')
+    parser.add_argument('--p2', choices = sorted(CONTROLLERS), default = 'follow', help = 'headless controller for player 2')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = Arguments()
+    if args.headless and args.replay:
+        start = time.perf_counter()
+        sim = Play_Replay(args.replay)
+        elapsed = time.perf_counter() - start
+        print('steps: %d in %.3fs  scores: %d - %d  checksum: %s' %
+              (sim.tick, elapsed, sim.scores[0], sim.scores[1], sim.Checksum()))
+    elif args.headless and args.netplay:
+        start = time.perf_counter()
+        ticks = args.max_ticks or 3000
+        sessions = Net_Headless(ticks, args.hz, args.latency / 1000.0, args.jitter / 1000.0, args.loss,
+                                controllers = (CONTROLLERS[args.p1](args.difficulty),
+                                               CONTROLLERS[args.p2](args.difficulty)))
+        elapsed = time.perf_counter() - start
+        for session in sessions:
+            print('player %d  rollbacks: %d  resimulated: %d  stalls: %d  checksum: %s' %
+                  (session.player + 1, session.rollbacks, session.resimulated, session.stalls, session.sim.Checksum()))
+        print('steps: %d in %.3fs  in sync: %s' %
+              (ticks, elapsed, sessions[0].sim.Checksum() == sessions[1].sim.Checksum()))
+    elif args.headless and args.balls:
+        ticks = args.max_ticks or 1200
+        swarm, elapsed = Swarm_Headless(args.balls, ticks, args.hz, not args.no_ball_collisions)
+        print('balls: %d  paddle hits: %d  escaped: %d' % (swarm.n, swarm.hits, swarm.escaped))
+        print('steps: %d in %.3fs (%.2f ms/step)' % (ticks, elapsed, elapsed / ticks * 1000))
+    elif args.headless:
+        max_ticks = args.max_ticks or MAX_TICKS
+        start = time.perf_counter()
+        table = BATCH_CONTROLLERS if args.batch else CONTROLLERS
+        controllers = (table[args.p1](args.difficulty), table[args.p2](args.difficulty))
+        if args.batch:
+            results = Batch_Headless(args.matches, args.hz, controllers, max_ticks)
+        else:
+            results = Headless(args.matches, args.hz, controllers, max_ticks)
+        elapsed = time.perf_counter() - start
+        ticks = sum(result[1] for result in results)
+        wins = [sum(1 for result in results if result[0][i] == 10) for i in range(2)]
+        print('matches: %d  player 1 wins: %d  player 2 wins: %d  unfinished: %d' %
+              (len(results), wins[0], wins[1], len(results) - sum(wins)))
+        print('steps: %d in %.3fs (%.0f steps/s, %.1f matches/s)' %
+              (ticks, elapsed, ticks / elapsed, len(results) / elapsed))
+    else:
+        link = None
+        player = 0
+        if args.host is not None:
+            link = netplay.Link(args.host)
+        elif args.join:
+            address, port = args.join.rsplit(':', 1)
+            link = netplay.Link(peer = (socket.gethostbyname(address), int(port)))
+            player = 1
+        if link and (args.latency or args.jitter or args.loss):
+            link = netplay.Shim(link, args.latency / 1000.0, args.jitter / 1000.0, args.loss)
+        main(args.hz, args.fps, args.profile, args.record, args.replay, link, player,
+             args.cpu - 1 if args.cpu else None, args.difficulty, args.balls, not args.no_ball_collisions,
+             args.capture, args.calls)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+#Collision helpers for Pong-Classic, plain integer math with no calls into SDL.
+#Boxes are (x, y, w, h) tuples of ints, laid out like an SDL_Rect.
+
+from math import cos, sin, radians
+
+
+def Intersects(a, b):
+    """ Gives the same answer as SDL_HasIntersection for two boxes """
+    return (a[2] > 0 and a[3] > 0 and b[2] > 0 and b[3] > 0 and
+            a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+            a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+def Segment_Hit(box, segment, item):
+    """ The box is split from the top into pieces that are segment pixels tall, like the
+        body of a paddle. returns (True, index of the first piece touching the item), or
+        (False, -1) if nothing is touching, the same result as Paddle.Is_Touching. """
+    if not Intersects(box, item):
+        return (False, -1)
+    if item[1] <= box[1]:
+        return (True, 0)
+    return (True, (item[1] - box[1]) // segment)
+
+
+def First_Hit(boxes, item):
+    """ returns (True, index of the first box touching the item) or (False, -1) """
+    for i in range(len(boxes)):
+        if Intersects(boxes[i], item):
+            return (True, i)
+    return (False, -1)
+
+
+def Axis_Times(start, length, delta, target_start, target_length):
+    """ returns when (as a fraction of delta) a moving span starts and stops overlapping
+        a still one along one axis, or (None, None) if it never does. """
+    if delta > 0:
+        return ((target_start - (start + length)) / delta, (target_start + target_length - start) / delta)
+    if delta < 0:
+        return ((target_start + target_length - start) / delta, (target_start - (start + length)) / delta)
+    if start < target_start + target_length and target_start < start + length:
+        return (float('-inf'), float('inf'))
+    return (None, None)
+
+
+def Sweep(box, dx, dy, target):
+    """ Swept box test: the box moves by (dx, dy) and the target stays still. returns
+        (t, axis) with t between 0 and 1 being how far along the move the box first
+        touches the target, and axis 0 if it hit a left or right face or 1 for a top or
+        bottom face. returns None if they never touch, or if they already overlap. """
+    x_entry, x_exit = Axis_Times(box[0], box[2], dx, target[0], target[2])
+    if x_entry is None:
+        return None
+    y_entry, y_exit = Axis_Times(box[1], box[3], dy, target[1], target[3])
+    if y_entry is None:
+        return None
+    entry = max(x_entry, y_entry)
+    if entry >= min(x_exit, y_exit) or entry < 0 or entry > 1:
+        return None
+    return (entry, 0 if x_entry >= y_entry else 1)
+
+
+def Intercept(x, y, degree, column, top, bottom):
+    """ returns the y the ball (its top left corner at x, y) will be at when its x gets to
+        column going at degree, or None if it is going away from column. The y it can be
+        at runs from top to bottom, and every bounce on the way is worked out at once by
+        unfolding them (a bounce is 360 - degree, so the ball just carries on through a
+        mirrored copy of the field) and folding the end point back into the field. """
+    dx = cos(radians(degree))
+    """ cos(radians(90)) is not quite 0, so going straight up or down is checked for """
+    if abs(dx) < 1e-9:
+        dx = 0.0
+    if (column - x) * dx < 0 or (dx == 0 and column != x):
+        return None
+    if column != x:
+        y += sin(radians(degree)) * (column - x) / dx
+    span = bottom - top
+    if span <= 0:
+        return top
+    y = (y - top) % (2 * span)
+    return top + (y if y <= span else 2 * span - y)
+
+
+# BENCHMARK_____________________________________________________________________________________________________
+def Benchmark(frames = 100000):
+    """ Times the collision checks of one frame (both paddles against the ball, the walls
+        against both paddles and the ball against the walls) through SDL_HasIntersection
+        and through this module. """
+    import os
+    import timeit
+    os.environ.setdefault('PYSDL2_DLL_PATH', os.path.dirname(os.path.abspath(__file__)))
+    from sdl2 import SDL_Rect, SDL_HasIntersection
+
+    size = 17
+    paddles = [[SDL_Rect(x, 290 + (i - 3) * size, size, size) for i in range(7)] for x in (20, 1245)]
+    walls = [SDL_Rect(0, 0, 1280, 20), SDL_Rect(0, 700, 1280, 20)]
+    ball = SDL_Rect(640, 330, 20, 20)
+    paddle_boxes = [(x, 290 - 3 * size, size, size * 7) for x in (20, 1245)]
+    wall_boxes = [(0, 0, 1280, 20), (0, 700, 1280, 20)]
+    ball_box = (640, 330, 20, 20)
+
+    def sdl_frame():
+        for body in paddles:
+            for part in body:
+                if SDL_HasIntersection(part, ball):
+                    break
+        for body in paddles:
+            for part in body:
+                if SDL_HasIntersection(walls[0], part) or SDL_HasIntersection(walls[1], part):
+                    break
+        for wall in walls:
+            if SDL_HasIntersection(wall, ball):
+                break
+
+    def math_frame():
+        for box in paddle_boxes:
+            Segment_Hit(box, size, ball_box)
+        for box in paddle_boxes:
+            First_Hit(wall_boxes, box)
+        First_Hit(wall_boxes, ball_box)
+
+    for name, frame in (('SDL_HasIntersection', sdl_frame), ('collision', math_frame)):
+        seconds = min(timeit.repeat(frame, number = frames, repeat = 3))
+        print('%-20s %8.2f us per frame' % (name, seconds / frames * 1000000))
+
+
+if __name__ == '__main__':
+    Benchmark()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+#Network play for Pong-Classic. Only inputs go over the network: every packet is a run of
+#one byte inputs for the steps the other side has not confirmed yet, so a lost packet is
+#covered by the next one. Shim sits in front of a Link and holds packets back or drops
+#them, so latency and packet loss can be tried out over localhost.
+
+import heapq
+import random
+import socket
+import struct
+import time
+
+MAGIC = b'PNG1'
+HEADER = struct.Struct('<4sIIIiB')
+MAX_INPUTS = 255
+
+
+def Pack(first, ack, frame, advantage, inputs):
+    """ first is the step of inputs[0], ack is how many of the other side's inputs have
+        arrived, and frame and advantage are where the sender is, for keeping in time """
+    inputs = inputs[:MAX_INPUTS]
+    return HEADER.pack(MAGIC, first, ack, frame, advantage, len(inputs)) + bytes(inputs)
+
+
+def Unpack(data):
+    """ returns (first, ack, frame, advantage, inputs), or None for anything that is not
+        a whole input packet """
+    if len(data) < HEADER.size:
+        return None
+    magic, first, ack, frame, advantage, count = HEADER.unpack_from(data)
+    if magic != MAGIC or len(data) != HEADER.size + count:
+        return None
+    return (first, ack, frame, advantage, data[HEADER.size:])
+
+
+class Link:
+    def __init__(self, port = 0, peer = None, address = ''):
+        """ A non-blocking UDP socket. Joining a game gives the peer (host, port) to send
+            to, while hosting leaves it out and answers whoever sends the first packet. """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((address, port))
+        self.socket.setblocking(False)
+        self.peer = peer
+        self.address = self.socket.getsockname()
+
+    def Connected(self):
+        return self.peer is not None
+
+    def Send(self, data):
+        if self.peer is None:
+            return
+        try:
+            self.socket.sendto(data, self.peer)
+        except OSError:
+            """ like a lost packet, e.g. the other side is not listening yet """
+            pass
+
+    def Receive(self):
+        packets = []
+        while True:
+            try:
+                data, address = self.socket.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue
+            if self.peer is None:
+                self.peer = address
+            if address == self.peer:
+                packets.append(data)
+        return packets
+
+    def Close(self):
+        self.socket.close()
+
+
+class Shim:
+    def __init__(self, link, latency = 0.0, jitter = 0.0, loss = 0.0, seed = None, clock = time.monotonic):
+        """ Sends through link after latency seconds, plus up to jitter more (which can
+            reorder packets), and drops loss (0 to 1) of them. clock can be swapped for a
+            fake one to make tests repeatable. """
+        self.link = link
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.clock = clock
+        self.queue = []
+        self.count = 0
+        self.dropped = 0
+
+    def Connected(self):
+        return self.link.Connected()
+
+    def Send(self, data):
+        if self.random.random() < self.loss:
+            self.dropped += 1
+        else:
+            due = self.clock() + self.latency + self.random.uniform(0, self.jitter)
+            heapq.heappush(self.queue, (due, self.count, data))
+            self.count += 1
+        self.Flush()
+
+    def Flush(self):
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            self.link.Send(heapq.heappop(self.queue)[2])
+
+    def Receive(self):
+        self.Flush()
+        return self.link.Receive()
+
+    def Close(self):
+        self.link.Close()
@@ -1,42 +1,134 @@
 """SDL2 wrapper package"""
+import os as _os
+import ast as _ast
+import importlib as _importlib
+import re as _re
 from .dll import get_dll_file, _bind
 from ctypes import c_int as _cint
+from .stdinc import Uint32
 
-from .audio import *
-from .blendmode import *
-from .clipboard import *
-from .cpuinfo import *
-from .endian import *
-from .error import *
-from .events import *
-from .filesystem import *
-from .gamecontroller import *
-from .gesture import *
-from .haptic import *
-from .hints import *
-from .joystick import *
-from .keyboard import *
-from .loadso import *
-from .log import *
-from .messagebox import *
-from .mouse import *
-from .pixels import *
-from .platform import *
-from .power import *
-from .rect import *
-from .render import *
-from .rwops import *
-from .shape import *
-from .stdinc import *
-from .surface import *
-from .syswm import *
-from .timer import *
-from .touch import *
-from .version import *
-from .video import *
-
-from .keycode import *
-from .scancode import *
+# The submodules whose names make up the sdl2 namespace, in the order they
+# used to be star-imported in (a name in a later module wins). They are only
+# imported when one of their names or the submodule itself is first used,
+# unless PYSDL2_EAGER_IMPORT is set.
+_SUBMODULES = ("audio", "blendmode", "clipboard", "cpuinfo", "endian", "error",
+               "events", "filesystem", "gamecontroller", "gesture", "haptic",
+               "hints", "joystick", "keyboard", "loadso", "log", "messagebox",
+               "mouse", "pixels", "platform", "power", "rect", "render",
+               "rwops", "shape", "stdinc", "surface", "syswm", "timer",
+               "touch", "version", "video", "keycode", "scancode")
+_index = None
+_ALL = _re.compile(r"^__all__\s*=\s*(\[.*?\])", _re.M | _re.S)
+
+
+def _exports(name):
+    """Gets the names a star import of the submodule gives, read from its
+    source, so the submodule does not have to be imported for it."""
+    path = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)),
+                         name + ".py")
+    with open(path) as source:
+        text = source.read()
+    # Most submodules start with a plain __all__ list, which is found without
+    # parsing the whole file.
+    match = _ALL.search(text)
+    if match:
+        return list(_ast.literal_eval(match.group(1)))
+    names = []
+    _toplevel(_ast.parse(text, path).body, names)
+    return [name for name in names if not name.startswith("_")]
+
+
+def _toplevel(body, names):
+    """Collects the names bound by module level statements, including the ones
+    in if and try blocks."""
+    for node in body:
+        if isinstance(node, _ast.Assign):
+            for target in node.targets:
+                if isinstance(target, _ast.Name):
+                    names.append(target.id)
+        elif isinstance(node, (_ast.FunctionDef, _ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, _ast.ImportFrom):
+            for alias in node.names:
+                if alias.name == "*":
+                    names.extend(_exports(node.module))
+                else:
+                    names.append(alias.asname or alias.name)
+        elif isinstance(node, _ast.Import):
+            for alias in node.names:
+                names.append((alias.asname or alias.name).split(".")[0])
+        elif isinstance(node, _ast.If):
+            _toplevel(node.body, names)
+            _toplevel(node.orelse, names)
+        elif isinstance(node, _ast.Try):
+            _toplevel(node.body, names)
+            for handler in node.handlers:
+                _toplevel(handler.body, names)
+            _toplevel(node.orelse, names)
+            _toplevel(node.finalbody, names)
+
+
+def _public(module):
+    """Gets the names a star import of the (imported) module gives."""
+    names = getattr(module, "__all__", None)
+    if names is None:
+        names = [name for name in vars(module) if not name.startswith("_")]
+    return names
+
+
+def _load_all():
+    """Imports every submodule into the namespace, as a plain star import of
+    each of them would."""
+    namespace = globals()
+    for name in _SUBMODULES:
+        module = _importlib.import_module("." + name, __name__)
+        for attr in _public(module):
+            namespace[attr] = getattr(module, attr)
+
+
+def _get_index():
+    """Maps every name of the namespace to the submodule it comes from."""
+    global _index
+    if _index is None:
+        index = {}
+        try:
+            for name in _SUBMODULES:
+                for attr in _exports(name):
+                    index[attr] = name
+        except (IOError, OSError, SyntaxError, ValueError):
+            # No usable sources (e.g. a bytecode only install), so the
+            # submodules have to be imported to find out.
+            index = {}
+            for name in _SUBMODULES:
+                module = _importlib.import_module("." + name, __name__)
+                for attr in _public(module):
+                    index[attr] = name
+        _index = index
+    return _index
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return _importlib.import_module("." + name, __name__)
+    if name == "__all__":
+        # from sdl2 import * needs everything
+        _load_all()
+        return [attr for attr in globals() if not attr.startswith("_")]
+    owner = _get_index().get(name)
+    if owner is None:
+        raise AttributeError("module %r has no attribute %r" %
+                             (__name__, name))
+    value = getattr(_importlib.import_module("." + owner, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_get_index()) | set(_SUBMODULES))
+
+
+if _os.getenv("PYSDL2_EAGER_IMPORT"):
+    _load_all()
 
 # At least Win32 platforms need this now.
 _SDL_SetMainReady = _bind("SDL_SetMainReady")
@@ -3,13 +3,32 @@ import os
 import sys
 import warnings
 from ctypes import CDLL
-from ctypes.util import find_library
+from time import perf_counter
 
-__all__ = ["DLL", "nullfunc"]
+__all__ = ["DLL", "nullfunc", "instrument", "get_call_stats",
+           "reset_call_stats"]
+
+# Calls and seconds per function name while instrumented, else None.
+_calls = None
+# The resolve() of every stub that was called, to switch them over when the
+# instrumentation is turned on or off.
+_resolved = []
+
+
+def _libnames(libnames):
+    """Gets the library names to search for on the current platform."""
+    platform = sys.platform
+    if type(libnames) is dict:
+        # different library names for the platforms
+        if platform not in libnames:
+            platform = "DEFAULT"
+        return libnames[platform]
+    return libnames
 
 
 def _findlib(libnames, path=None):
-    """."""
+    """Gets the library files in path, which can hold several directories
+    separated by os.pathsep."""
     platform = sys.platform
     if platform in ("win32",):
         pattern = "%s.dll"
@@ -17,20 +36,23 @@ def _findlib(libnames, path=None):
         pattern = "lib%s.dylib"
     else:
         pattern = "lib%s.so"
-    searchfor = libnames
-    if type(libnames) is dict:
-        # different library names for the platforms
-        if platform not in libnames:
-            platform = "DEFAULT"
-        searchfor = libnames[platform]
     results = []
     if path:
-        for libname in searchfor:
+        for libname in _libnames(libnames):
             for subpath in str.split(path, os.pathsep):
                 dllfile = os.path.join(subpath, pattern % libname)
                 if os.path.exists(dllfile):
                     results.append(dllfile)
-    for libname in searchfor:
+    return results
+
+
+def _findsystemlib(libnames):
+    """Gets the library files the system knows of."""
+    # ctypes.util starts subprocesses to ask the system, so it is only
+    # imported once nothing usable was found in PYSDL2_DLL_PATH.
+    from ctypes.util import find_library
+    results = []
+    for libname in _libnames(libnames):
         dllfile = find_library(libname)
         if dllfile:
             results.append(dllfile)
@@ -47,21 +69,28 @@ class DLL(object):
     """
     def __init__(self, libinfo, libnames, path=None):
         self._dll = None
-        foundlibs = _findlib(libnames, path)
-        dllmsg = "PYSDL2_DLL_PATH: %s" % (os.getenv("PYSDL2_DLL_PATH") or "unset")
+        foundlibs = []
+        for search in (lambda: _findlib(libnames, path),
+                       lambda: _findsystemlib(libnames)):
+            libfiles = search()
+            foundlibs.extend(libfiles)
+            for libfile in libfiles:
+                try:
+                    self._dll = CDLL(libfile)
+                    self._libfile = libfile
+                    break
+                except Exception as exc:
+                    # Could not load the DLL, move to the next, but inform
+                    # the user about something weird going on - this may
+                    # become noisy, but is better than confusing the users
+                    # with the RuntimeError below
+                    warnings.warn(repr(exc), DLLWarning)
+            if self._dll is not None:
+                break
         if len(foundlibs) == 0:
+            dllmsg = "PYSDL2_DLL_PATH: %s" % (os.getenv("PYSDL2_DLL_PATH") or "unset")
             raise RuntimeError("could not find any library for %s (%s)" %
                                (libinfo, dllmsg))
-        for libfile in foundlibs:
-            try:
-                self._dll = CDLL(libfile)
-                self._libfile = libfile
-                break
-            except Exception as exc:
-                # Could not load the DLL, move to the next, but inform the user
-                # about something weird going on - this may become noisy, but
-                # is better than confusing the users with the RuntimeError below
-                warnings.warn(repr(exc), DLLWarning)
         if self._dll is None:
             raise RuntimeError("found %s, but it's not usable for the library %s" %
                                (foundlibs, libinfo))
@@ -71,20 +100,60 @@ class DLL(object):
 
     def bind_function(self, funcname, args=None, returns=None, optfunc=None):
         """Binds the passed argument and return value types to the specified
-        function."""
+        function.
+
+        The function is looked up in the library on its first call, so that
+        unused functions cost nothing at import time. Until then a stub
+        stands in for it, which on that call sets up the function and puts
+        it in its own place in the module that bound it and in the sdl2
+        package. A module that imported the stub under the same name, e.g.
+        with from sdl2 import *, gets the function in its place the first
+        time it calls the stub; other modules are never looked at.
+        """
+        namespace = sys._getframe(1).f_globals
+        func = raw = None
+        # The globals of the modules that called the stub under its name.
+        importers = []
+
+        def stub(*fargs):
+            target = func or resolve()
+            names = sys._getframe(1).f_globals
+            if names.get(funcname) is stub:
+                names[funcname] = target
+                importers.append(names)
+            return target(*fargs)
+
+        def resolve():
+            nonlocal func, raw
+            previous = func
+            if raw is None:
+                raw = self._resolve(funcname, args, returns, optfunc)
+                _resolved.append(resolve)
+            func = raw if _calls is None else _instrumented(funcname, raw)
+            package = sys.modules.get("sdl2")
+            for names in [namespace, getattr(package, "__dict__", {})] + \
+                    importers:
+                value = names.get(funcname)
+                if value is stub or (value is previous and value is not None):
+                    names[funcname] = func
+            return func
+
+        stub.__name__ = stub.__qualname__ = funcname
+        stub.resolve = resolve
+        return stub
+
+    def _resolve(self, funcname, args, returns, optfunc):
+        """Looks up funcname and sets its argument and return value types,
+        or falls back to optfunc if the library does not have it."""
         func = getattr(self._dll, funcname, None)
-        warnings.warn\
-            ("function '%s' not found in %r, using replacement" %
-             (funcname, self._dll), ImportWarning)
         if not func:
             if optfunc:
                 warnings.warn\
                     ("function '%s' not found in %r, using replacement" %
                      (funcname, self._dll), ImportWarning)
-                func = _nonexistent(funcname, optfunc)
-            else:
-                raise ValueError("could not find function '%s' in %r" %
-                                 (funcname, self._dll))
+                return _nonexistent(funcname, optfunc)
+            raise ValueError("could not find function '%s' in %r" %
+                             (funcname, self._dll))
         func.argtypes = args
         func.restype = returns
         return func
@@ -105,10 +174,68 @@ def _nonexistent(funcname, func):
     return wrapper
 
 
+def _instrumented(funcname, func):
+    """Wraps func to count its calls and time them under funcname."""
+    def wrapper(*fargs):
+        start = perf_counter()
+        try:
+            return func(*fargs)
+        finally:
+            elapsed = perf_counter() - start
+            calls = _calls
+            if calls is not None:
+                entry = calls.get(funcname)
+                if entry is None:
+                    entry = calls[funcname] = [0, 0.0]
+                entry[0] += 1
+                entry[1] += elapsed
+    wrapper.__name__ = funcname
+    return wrapper
+
+
+def instrument(enable=True):
+    """Turns the counting and timing of calls to the bound functions on or
+    off, for the functions of every library.
+
+    While it is off, the functions are called directly, without anything in
+    between. The functions are switched over in the modules that bound
+    them, in the sdl2 package and in the modules that got them in place of
+    a stub, but copies kept anywhere else (under another name, in a list,
+    ...) are not; setting PYSDL2_INSTRUMENT before importing sdl2 counts
+    every call from the start.
+    """
+    global _calls
+    if enable == (_calls is not None):
+        return
+    _calls = {} if enable else None
+    for resolve in _resolved:
+        resolve()
+
+
+def get_call_stats():
+    """Gets a {name: (calls, seconds)} dict of the calls made since the
+    instrumentation was turned on or the stats were last reset."""
+    if _calls is None:
+        return {}
+    return dict((name, tuple(entry)) for name, entry in _calls.items())
+
+
+def reset_call_stats():
+    """Gets the call stats like get_call_stats() and starts counting from
+    zero again, e.g. once per frame."""
+    stats = get_call_stats()
+    if _calls is not None:
+        _calls.clear()
+    return stats
+
+
 def nullfunc(*args):
     """A simple no-op function to be used as dll replacement."""
     return
 
+if os.getenv("PYSDL2_INSTRUMENT"):
+    instrument()
+
 try:
     dll = DLL("SDL2", ["SDL2", "SDL2-2.0"], os.getenv("PYSDL2_DLL_PATH"))
 except RuntimeError as exc:
@@ -2,9 +2,11 @@
 Conversion routines for sequences.
 """
 import ctypes
+from ..rect import SDL_Point, SDL_Rect
+from .compat import UnsupportedError
 
 __all__ = ["CTypesView", "to_ctypes", "to_list", "to_tuple", "create_array",
-           "MemoryView"]
+           "MemoryView", "RectArray", "PointArray"]
 
 
 # Hack around an import error using relative import paths in Python 2.7
@@ -33,6 +35,10 @@ def to_ctypes(dataseq, dtype, mcount=0):
         count = mcount
     else:
         count = len(dataseq)
+    if isinstance(dataseq, _StructArray) and dataseq.dtype is dtype and \
+            count <= len(dataseq):
+        # already a ctypes array of dtype, no need to copy it
+        return dataseq.buffer, count
     if isinstance(dataseq, CTypesView):
         itemsize = ctypes.sizeof(dtype)
         if itemsize == 1:
@@ -310,3 +316,186 @@ class MemoryView(object):
     def source(self):
         """The underlying data source."""
         return self._source
+
+
+class _StructArray(object):
+    """A resizable array of ctypes structures, which keeps its items side
+    by side in a single ctypes buffer.
+
+    It can be passed straight to the SDL functions taking a pointer to
+    the first of several structures, and changed in place through view or
+    numpy_view() before every call instead of being built again.
+    """
+    dtype = None
+
+    def __init__(self, items=None, capacity=0):
+        """Creates a new array holding the passed items, which can be
+        structures of the array's type or sequences of their fields.
+
+        capacity reserves room for that many items up front.
+        """
+        items = list(items or ())
+        self._count = 0
+        self._buffer = None
+        self._pointer = None
+        self._allocate(max(capacity, len(items)))
+        self.extend(items)
+
+    def _allocate(self, capacity):
+        """Moves the items into a new buffer with room for capacity
+        items."""
+        buf = (self.dtype * capacity)()
+        if self._count:
+            ctypes.memmove(buf, self._buffer,
+                           self._count * ctypes.sizeof(self.dtype))
+        self._buffer = buf
+        self._pointer = ctypes.cast(buf, ctypes.POINTER(self.dtype))
+
+    def _reserve(self, count):
+        """Makes room for at least count items."""
+        if count > len(self._buffer):
+            self._allocate(max(count, 2 * len(self._buffer), 8))
+
+    def _item(self, value):
+        """Gets value as a structure of the array's type."""
+        if isinstance(value, self.dtype):
+            return value
+        return self.dtype(*value)
+
+    def __repr__(self):
+        return "%s(count=%d, capacity=%d)" % (type(self).__name__,
+                                              self._count, self.capacity)
+
+    def __len__(self):
+        """Returns the amount of items in the array."""
+        return self._count
+
+    def __getitem__(self, index):
+        """Returns the item at the specified index, which shares its
+        memory with the array until the array has to grow."""
+        if type(index) is slice:
+            return [self._buffer[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("index '%d' is out of bounds for '%d'" %
+                             (index, self._count))
+        return self._buffer[index]
+
+    def __setitem__(self, index, value):
+        """Sets the item at index to the specified value.
+
+        A slice can only be set to as many items as it covers, the array
+        does not grow or shrink that way.
+        """
+        if type(index) is slice:
+            indices = range(*index.indices(self._count))
+            values = [self._item(item) for item in value]
+            if len(values) != len(indices):
+                raise ValueError("cannot set %d items to a slice of %d" %
+                                 (len(values), len(indices)))
+            for i, item in zip(indices, values):
+                self._buffer[i] = item
+            return
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("index '%d' is out of bounds for '%d'" %
+                             (index, self._count))
+        self._buffer[index] = self._item(value)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._buffer[index]
+
+    def append(self, value):
+        """Adds an item to the end of the array."""
+        self._reserve(self._count + 1)
+        self._buffer[self._count] = self._item(value)
+        self._count += 1
+
+    def extend(self, values):
+        """Adds all of the passed items to the end of the array."""
+        values = [self._item(value) for value in values]
+        self._reserve(self._count + len(values))
+        for value in values:
+            self._buffer[self._count] = value
+            self._count += 1
+
+    def resize(self, count):
+        """Changes the amount of items, new items are set to zero."""
+        if count < 0:
+            raise ValueError("count must not be negative")
+        self._reserve(count)
+        if count > self._count:
+            size = ctypes.sizeof(self.dtype)
+            ctypes.memset(ctypes.addressof(self._buffer) + self._count * size,
+                          0, (count - self._count) * size)
+        self._count = count
+
+    def clear(self):
+        """Removes all items, but keeps the buffer for reuse."""
+        self._count = 0
+
+    @property
+    def capacity(self):
+        """The amount of items the array can hold before it has to grow."""
+        return len(self._buffer)
+
+    @property
+    def buffer(self):
+        """The ctypes array holding the items.
+
+        It can hold more than len() items, of which only the first len()
+        ones are used, and it is replaced by a bigger one when the array
+        has to grow.
+        """
+        return self._buffer
+
+    @property
+    def _as_parameter_(self):
+        """Lets ctypes pass the array as a pointer to its first item."""
+        return self._pointer
+
+    @property
+    def view(self):
+        """A writable memoryview of the items as a 2D array of ints, with
+        one row of fields per item.
+
+        It shares its memory with the array until the array has to grow.
+        An empty array gets an empty, one-dimensional view, since a
+        memoryview cannot have a zero in its shape.
+        """
+        fields = len(self.dtype._fields_)
+        nbytes = self._count * ctypes.sizeof(self.dtype)
+        view = memoryview(self._buffer).cast("B")[:nbytes]
+        if not self._count:
+            return view.cast("i")
+        return view.cast("i", (self._count, fields))
+
+    def numpy_view(self):
+        """Returns a numpy array with a structured dtype that shares its
+        memory with the items until the array has to grow, so fields can
+        be changed for all items at once, e.g. view["x"] += 1.
+
+        Raises an UnsupportedError, if numpy could not be loaded.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise UnsupportedError(self.numpy_view,
+                                   "numpy module could not be loaded")
+        return numpy.frombuffer(self._buffer, dtype=numpy.dtype(self.dtype),
+                                count=self._count)
+
+
+class RectArray(_StructArray):
+    """A resizable array of SDL_Rect structures for SDL_RenderFillRects(),
+    SDL_RenderDrawRects(), SDL_FillRects() and the like."""
+    dtype = SDL_Rect
+
+
+class PointArray(_StructArray):
+    """A resizable array of SDL_Point structures for
+    SDL_RenderDrawPoints(), SDL_RenderDrawLines() and the like."""
+    dtype = SDL_Point
@@ -1,7 +1,7 @@
 """Drawing routines for software surfaces."""
 import ctypes
 from .compat import isiterable, UnsupportedError
-from .array import to_ctypes
+from .array import to_ctypes, RectArray
 from .color import convert_to_color
 from .. import surface, pixels, rect
 from .algorithms import clipline
@@ -53,7 +53,9 @@ def fill(target, color, area=None):
     rtarget = _get_target_surface(target)
 
     varea = None
-    if area is not None and isiterable(area):
+    if isinstance(area, RectArray):
+        varea = area
+    elif area is not None and isiterable(area):
         # can be either a single rect or a list of rects)
         if len(area) == 4:
             # is it a rect?
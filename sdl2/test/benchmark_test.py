@@ -0,0 +1,56 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from .util import benchmark
+
+
+class BenchmarkTest(unittest.TestCase):
+    __tags__ = ["sdl", "benchmark"]
+
+    def test_parse_importtime(self):
+        lines = ["import time: self [us] | cumulative | imported package",
+                 "import time:       120 |        120 |   ctypes",
+                 "import time:      1500 |       1620 | sdl2.dll",
+                 "import time:      2000 |       3620 | sdl2",
+                 "some other output"]
+        self.assertEqual(benchmark._parse_importtime(lines),
+                         [{"name": "sdl2.dll", "self": 1.5, "cumulative": 1.62},
+                          {"name": "sdl2", "self": 2.0, "cumulative": 3.62}])
+
+    def test_run_benchmark(self):
+        report = benchmark.run_benchmark(["sdl2"], 1)
+        self.assertEqual(report["runs"], 1)
+        self.assertEqual(list(report["targets"]), ["sdl2"])
+        result = report["targets"]["sdl2"]
+        for key in ("cold", "warm"):
+            self.assertEqual(len(result[key]["runs"]), 1)
+            self.assertGreater(result[key]["median"], 0)
+        names = [module["name"] for module in result["modules"]]
+        self.assertIn("sdl2", names)
+        self.assertIn("sdl2.dll", names)
+        self.assertNotIn("sdl2.video", names)
+        bindings = result["bindings"]
+        self.assertGreater(bindings["stubs"] + bindings["resolved"], 0)
+        self.assertTrue(report["dll"])
+
+    def test_measure(self):
+        source = os.path.join(benchmark._ROOT, "sdl2")
+        cache = tempfile.mkdtemp(prefix="sdl2bench")
+        try:
+            benchmark._copy_package(cache)
+            copy = os.path.join(cache, "sdl2")
+            self.assertFalse(os.path.exists(os.path.join(copy, "__pycache__")))
+            self.assertFalse(os.path.exists(os.path.join(copy, "test")))
+            cold = benchmark.measure("sdl2")
+            self.assertNotEqual(os.path.dirname(cold["path"]), source)
+            warm = benchmark.measure("sdl2", cache)
+            self.assertEqual(os.path.dirname(warm["path"]), copy)
+            self.assertTrue(os.path.isdir(os.path.join(copy, "__pycache__")))
+        finally:
+            shutil.rmtree(cache, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,119 @@
+import os
+import sys
+import types
+import unittest
+import warnings
+from ctypes import c_int
+from .. import dll
+from ..stdinc import Uint32
+
+
+class DLLTest(unittest.TestCase):
+    __tags__ = ["sdl"]
+
+    def bind(self, source):
+        namespace = {"__package__": None, "_bind": dll._bind,
+                     "nullfunc": dll.nullfunc, "Uint32": Uint32,
+                     "c_int": c_int}
+        exec(source, namespace)
+        return namespace
+
+    def test_findlib(self):
+        path = os.path.dirname(dll.get_dll_file())
+        libfiles = dll._findlib(["SDL2", "SDL2-2.0"],
+                                os.pathsep.join(["nonexistent", path]))
+        if os.path.exists(dll.get_dll_file()):
+            self.assertIn(dll.get_dll_file(), libfiles)
+        self.assertEqual(dll._findlib(["SDL2"], None), [])
+        self.assertEqual(dll._libnames({"DEFAULT": ["a"]}), ["a"])
+        self.assertEqual(dll._libnames({sys.platform: ["b"], "DEFAULT": ["a"]}),
+                         ["b"])
+
+    def test_bind_function(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            namespace = self.bind(
+                "SDL_GetTicks = _bind('SDL_GetTicks', None, Uint32)\n"
+                "stub = SDL_GetTicks\n")
+        self.assertEqual(caught, [])
+        stub = namespace["stub"]
+        self.assertEqual(stub.__name__, "SDL_GetTicks")
+        self.assertFalse(hasattr(stub, "restype"))
+        self.assertIsInstance(stub(), int)
+        func = namespace["SDL_GetTicks"]
+        self.assertIsNot(func, stub)
+        self.assertIs(func.restype, Uint32)
+        self.assertIsNone(func.argtypes)
+        self.assertIs(stub.resolve(), func)
+        self.assertIsInstance(stub(), int)
+
+    def test_bind_function_importers(self):
+        namespace = self.bind(
+            "SDL_GetTicks = _bind('SDL_GetTicks', None, Uint32)\n")
+        stub = namespace["SDL_GetTicks"]
+        importer = types.ModuleType("sdl2_dll_test_importer")
+        importer.SDL_GetTicks = importer.ticks = stub
+        exec("def call():\n    return SDL_GetTicks()\n", vars(importer))
+        bystander = types.ModuleType("sdl2_dll_test_bystander")
+        bystander.SDL_GetTicks = stub
+        sys.modules[bystander.__name__] = bystander
+        try:
+            stub()
+        finally:
+            del sys.modules[bystander.__name__]
+        func = namespace["SDL_GetTicks"]
+        self.assertIsNot(func, stub)
+        self.assertIs(importer.SDL_GetTicks, stub)
+        self.assertIsInstance(importer.call(), int)
+        self.assertIs(importer.SDL_GetTicks, func)
+        self.assertIs(importer.ticks, stub)
+        self.assertIs(bystander.SDL_GetTicks, stub)
+        dll.instrument()
+        try:
+            self.assertIsNot(importer.SDL_GetTicks, func)
+            importer.call()
+            self.assertEqual(dll.reset_call_stats()["SDL_GetTicks"][0], 1)
+        finally:
+            dll.instrument(False)
+        self.assertIs(importer.SDL_GetTicks, func)
+
+    def test_bind_function_missing(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            namespace = self.bind(
+                "SDL_Missing = _bind('SDL_Missing', [c_int], None, nullfunc)\n"
+                "SDL_Required = _bind('SDL_Required', [c_int], None)\n")
+            self.assertEqual(caught, [])
+            self.assertIsNone(namespace["SDL_Missing"](1))
+            self.assertEqual([w.category for w in caught],
+                             [ImportWarning, RuntimeWarning])
+        self.assertRaises(ValueError, namespace["SDL_Required"], 1)
+
+    def test_instrument(self):
+        namespace = self.bind(
+            "SDL_GetTicks = _bind('SDL_GetTicks', None, Uint32)\n"
+            "stub = SDL_GetTicks\n")
+        stub = namespace["stub"]
+        stub()
+        func = namespace["SDL_GetTicks"]
+        self.assertEqual(dll.get_call_stats(), {})
+        dll.instrument()
+        try:
+            wrapper = namespace["SDL_GetTicks"]
+            self.assertIsNot(wrapper, func)
+            stub()
+            wrapper()
+            wrapper()
+            calls, seconds = dll.reset_call_stats()["SDL_GetTicks"]
+            self.assertEqual(calls, 3)
+            self.assertGreaterEqual(seconds, 0)
+            self.assertNotIn("SDL_GetTicks", dll.get_call_stats())
+        finally:
+            dll.instrument(False)
+        self.assertIs(namespace["SDL_GetTicks"], func)
+        stub()
+        self.assertEqual(dll.get_call_stats(), {})
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -4,6 +4,14 @@ import ctypes
 import struct
 import unittest
 from ..ext import array as sdlextarray
+from ..rect import SDL_Point, SDL_Rect
+from ..surface import SDL_CreateRGBSurface, SDL_FillRects, SDL_FreeSurface
+
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
 
 singlebyteseq = [x for x in range(0x100)]
 doublebyteseq = [x for x in range(0x10000)]
@@ -360,6 +368,83 @@ class SDL2ExtArrayTest(unittest.TestCase):
         for i in (0, 3, 5, 6, 7, 9, 10, 12, "test", self):
             self.assertRaises(TypeError, sdlextarray.create_array, barr, i)
 
+    def test_RectArray(self):
+        rects = sdlextarray.RectArray([(0, 0, 2, 2), SDL_Rect(4, 5, 6, 7)])
+        self.assertEqual(len(rects), 2)
+        self.assertEqual(repr(rects), "RectArray(count=2, capacity=2)")
+        self.assertEqual(rects.dtype, SDL_Rect)
+        self.assertEqual((rects[1].x, rects[1].h), (4, 7))
+        self.assertEqual(rects[-1].y, 5)
+        self.assertRaises(IndexError, rects.__getitem__, 2)
+        rects[0].w = 3
+        self.assertEqual(rects.buffer[0].w, 3)
+        rects[0] = (1, 1, 1, 1)
+        self.assertEqual([r.x for r in rects], [1, 4])
+        self.assertEqual([r.x for r in rects[1:]], [4])
+        rects[::-1] = [(4, 4, 4, 4), SDL_Rect(1, 1, 1, 1)]
+        self.assertEqual([r.x for r in rects], [1, 4])
+        rects[2:] = []
+        self.assertRaises(ValueError, rects.__setitem__, slice(0, 2),
+                          [(1, 1, 1, 1)])
+        for i in range(10):
+            rects.append((i, i, 1, 1))
+        self.assertEqual(len(rects), 12)
+        self.assertGreaterEqual(rects.capacity, 12)
+        self.assertEqual((rects[0].x, rects[11].x), (1, 9))
+        rects.resize(1)
+        rects.resize(3)
+        self.assertEqual((rects[1].x, rects[2].w), (0, 0))
+        rects.clear()
+        self.assertEqual(len(rects), 0)
+        self.assertEqual(list(rects), [])
+        self.assertRaises(ValueError, rects.resize, -1)
+        self.assertRaises(TypeError, rects.append, (1, 2, 3, 4, 5))
+
+    def test_RectArray_view(self):
+        rects = sdlextarray.RectArray([(0, 0, 2, 2), (4, 5, 6, 7)], 8)
+        view = rects.view
+        self.assertEqual(view.shape, (2, 4))
+        self.assertEqual(view.tolist(), [[0, 0, 2, 2], [4, 5, 6, 7]])
+        view[1, 0] = 9
+        self.assertEqual(rects[1].x, 9)
+
+        points = sdlextarray.PointArray([(1, 2), SDL_Point(3, 4)])
+        self.assertEqual(points.dtype, SDL_Point)
+        self.assertEqual(points.view.tolist(), [[1, 2], [3, 4]])
+
+        for empty in (sdlextarray.RectArray(),
+                      sdlextarray.RectArray(capacity=4)):
+            self.assertEqual(len(empty.view), 0)
+            self.assertEqual(empty.view.tolist(), [])
+
+    def test_RectArray_ctypes(self):
+        rects = sdlextarray.RectArray([(0, 0, 2, 2), (2, 2, 2, 2)], 4)
+        buf, count = sdlextarray.to_ctypes(rects, SDL_Rect)
+        self.assertIs(buf, rects.buffer)
+        self.assertEqual(count, 2)
+        sf = SDL_CreateRGBSurface(0, 4, 4, 32, 0, 0, 0, 0)
+        try:
+            self.assertEqual(SDL_FillRects(sf, rects, len(rects), 0xFFFFFF), 0)
+            pixels = ctypes.cast(sf.contents.pixels,
+                                 ctypes.POINTER(ctypes.c_uint32))
+            pitch = sf.contents.pitch // 4
+            self.assertEqual(pixels[0] & 0xFFFFFF, 0xFFFFFF)
+            self.assertEqual(pixels[3 * pitch + 3] & 0xFFFFFF, 0xFFFFFF)
+            self.assertEqual(pixels[3] & 0xFFFFFF, 0)
+        finally:
+            SDL_FreeSurface(sf)
+
+    @unittest.skipIf(not _HASNUMPY, "numpy module is not supported")
+    def test_RectArray_numpy_view(self):
+        rects = sdlextarray.RectArray([(0, 0, 2, 2), (4, 5, 6, 7)])
+        nparray = rects.numpy_view()
+        self.assertEqual(nparray.shape, (2,))
+        self.assertEqual(list(nparray["x"]), [0, 4])
+        nparray["x"] += 10
+        self.assertEqual([r.x for r in rects], [10, 14])
+        points = sdlextarray.PointArray([(1, 2), (3, 4)])
+        self.assertEqual(list(points.numpy_view()["y"]), [2, 4])
+
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -1,4 +1,6 @@
+import os
 import sys
+import subprocess
 import unittest
 from .. import SDL_Init, SDL_WasInit, SDL_InitSubSystem, SDL_QuitSubSystem, \
     SDL_Quit, SDL_INIT_AUDIO, SDL_INIT_EVERYTHING, SDL_INIT_GAMECONTROLLER, \
@@ -53,5 +55,62 @@ class SDLTest(unittest.TestCase):
         SDL_QuitSubSystem(SDL_INIT_HAPTIC)
 
 
+class SDLLazyImportTest(unittest.TestCase):
+    __tags__ = ["sdl"]
+
+    def run_python(self, code, **env):
+        environ = dict(os.environ)
+        environ.update(env)
+        path = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        environ["PYTHONPATH"] = os.pathsep.join(
+            [path] + [p for p in [environ.get("PYTHONPATH")] if p])
+        output = subprocess.check_output([sys.executable, "-W", "ignore", "-c",
+                                          code], env=environ)
+        return output.decode("utf-8").split()
+
+    def test_submodules_load_on_use(self):
+        result = self.run_python(
+            "import sys, sdl2\n"
+            "print('sdl2.audio' in sys.modules)\n"
+            "sdl2.SDL_GetNumAudioDrivers\n"
+            "print('sdl2.audio' in sys.modules)\n"
+            "print(sdl2.audio is sys.modules['sdl2.audio'])\n"
+            "print('sdl2.haptic' in sys.modules)\n")
+        self.assertEqual(result, ["False", "True", "True", "False"])
+
+    def test_eager_import(self):
+        result = self.run_python(
+            "import sys, sdl2\n"
+            "print('sdl2.haptic' in sys.modules)\n",
+            PYSDL2_EAGER_IMPORT="1")
+        self.assertEqual(result, ["True"])
+
+    def test_star_import(self):
+        from .. import _SUBMODULES, _get_index, _public
+        import importlib
+        namespace = {}
+        exec("from sdl2 import *", namespace)
+        public = set()
+        for name in _SUBMODULES:
+            module = importlib.import_module("sdl2." + name)
+            public.update(_public(module))
+        for attr in public:
+            self.assertIn(attr, namespace)
+        self.assertEqual(set(_get_index()), public)
+        for attr, owner in _get_index().items():
+            module = importlib.import_module("sdl2." + owner)
+            self.assertIs(namespace[attr], getattr(module, attr))
+        self.assertIn("SDL_Init", namespace)
+        self.assertIn("video", namespace)
+
+    def test_getattr(self):
+        import sdl2
+        from .. import video
+        self.assertIs(sdl2.SDL_CreateWindow, video.SDL_CreateWindow)
+        self.assertIn("SDL_CreateWindow", dir(sdl2))
+        self.assertRaises(AttributeError, getattr, sdl2, "SDL_NoSuchThing")
+
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
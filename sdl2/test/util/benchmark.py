@@ -0,0 +1,227 @@
+# #
+# # This file is placed under the public domain.
+# #
+"""Import time and binding cost benchmarks.
+
+Every measurement imports a module in a fresh interpreter, so nothing is
+shared between runs. Run it with
+
+    python -m sdl2.test.util.benchmark [-n RUNS] [-o report.json] [MODULE ...]
+
+and it writes a JSON report with, for each module (sdl2, sdl2.sdlttf and
+sdl2.ext by default):
+
+ * cold: the import times in ms with no bytecode cache, so every sdl2
+   source file has to be compiled,
+ * warm: the import times in ms with the bytecode cache in place,
+ * modules: what each sdl2 module took during the first warm run, in ms,
+   on its own ("self") and together with what it imported ("cumulative"),
+ * external: the time in ms that run spent importing anything outside of
+   sdl2, like ctypes or numpy,
+ * bindings: how many functions were declared (stubs), how many of them
+   were set up while importing (resolved) and how long setting up all of
+   the remaining ones takes in ms (resolve_ms).
+
+Every run imports a copy of the sdl2 package made in a temporary directory,
+so no bytecode cached in the source tree is ever used: a cold run gets a
+fresh copy and does not write any, while the warm runs share one copy that
+the first of them fills.
+
+PYSDL2_DLL_PATH defaults to the directory holding the sdl2 package, where
+the libraries are bundled, and SDL uses its dummy video and audio drivers.
+"""
+import os
+import sys
+import json
+import shutil
+import platform
+import optparse
+import tempfile
+import subprocess
+
+TARGETS = ["sdl2", "sdl2.sdlttf", "sdl2.ext"]
+
+# Imports the module, counts the bindings of the sdl2 modules loaded with
+# it and prints the results as JSON on the last line of stdout.
+_CHILD = """
+import sys, time, json
+from ctypes import _CFuncPtr
+start = time.perf_counter()
+__import__(%(target)r)
+elapsed = time.perf_counter() - start
+stubs = {}
+resolved = {}
+for name, module in list(sys.modules.items()):
+    if name.split(".")[0] != "sdl2" or module is None:
+        continue
+    for value in list(vars(module).values()):
+        if isinstance(value, _CFuncPtr):
+            resolved[id(value)] = value
+        elif callable(getattr(value, "resolve", None)):
+            stubs[id(value)] = value
+start = time.perf_counter()
+for stub in stubs.values():
+    try:
+        stub.resolve()
+    except ValueError:
+        pass
+resolve = time.perf_counter() - start
+import sdl2
+print(json.dumps({"ms": elapsed * 1000, "stubs": len(stubs),
+                  "resolved": len(resolved), "resolve_ms": resolve * 1000,
+                  "version": sdl2.__version__,
+                  "dll": sdl2.dll.get_dll_file(), "path": sdl2.__file__}))
+"""
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))))
+
+
+def _copy_package(directory):
+    """Copies the sources of the sdl2 package, without its tests or any
+    cached bytecode, into directory."""
+    shutil.copytree(os.path.join(_ROOT, "sdl2"),
+                    os.path.join(directory, "sdl2"),
+                    ignore=shutil.ignore_patterns("__pycache__", "*.pyc",
+                                                  "test"))
+
+
+def _environment(directory, write=True):
+    """Gets the environment for a child interpreter, which imports the
+    copy of sdl2 in directory and writes bytecode next to it if write is
+    set. The child has to run in directory too, since python -c puts the
+    current directory first on sys.path."""
+    env = dict(os.environ)
+    env.setdefault("PYSDL2_DLL_PATH", _ROOT)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env["PYTHONPATH"] = os.pathsep.join([directory] +
+                                        [p for p in [env.get("PYTHONPATH")] if p])
+    env.pop("PYSDL2_EAGER_IMPORT", None)
+    # Python 3.8+ would keep the bytecode somewhere else entirely.
+    env.pop("PYTHONPYCACHEPREFIX", None)
+    if write:
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+    else:
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def _parse_importtime(lines):
+    """Gets the sdl2 modules from -X importtime output, as a list of
+    dicts in import order."""
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        if name.split(".")[0] != "sdl2":
+            continue
+        modules.append({"name": name,
+                        "self": int(fields[0]) / 1000.0,
+                        "cumulative": int(fields[1]) / 1000.0})
+    return modules
+
+
+def measure(target, cache=None):
+    """Imports target in a new interpreter and returns what the child
+    measured, with the sdl2 modules it imported added as "modules".
+
+    cache is a directory holding a copy of sdl2 (see _copy_package) to
+    import and to write bytecode into. Without it, a fresh copy is made and
+    nothing is written to it."""
+    empty = None
+    if cache is None:
+        empty = tempfile.mkdtemp(prefix="sdl2bench")
+        _copy_package(empty)
+    env = _environment(cache or empty, empty is None)
+    try:
+        proc = subprocess.Popen([sys.executable, "-X", "importtime", "-c",
+                                 _CHILD % {"target": target}],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                env=env, cwd=cache or empty)
+        out, err = proc.communicate()
+    finally:
+        if empty is not None:
+            shutil.rmtree(empty, ignore_errors=True)
+    if proc.returncode != 0:
+        raise RuntimeError("importing %s failed:\n%s" %
+                           (target, err.decode("utf-8", "replace")))
+    result = json.loads(out.decode("utf-8").strip().splitlines()[-1])
+    result["modules"] = _parse_importtime(err.decode("utf-8").splitlines())
+    return result
+
+
+def _summary(times):
+    times = sorted(times)
+    middle = len(times) // 2
+    median = times[middle] if len(times) % 2 else \
+        (times[middle - 1] + times[middle]) / 2.0
+    return {"min": times[0], "median": median, "max": times[-1],
+            "runs": times}
+
+
+def run_benchmark(targets=None, runs=5):
+    """Benchmarks the imports of targets and returns the report."""
+    targets = targets or TARGETS
+    cache = tempfile.mkdtemp(prefix="sdl2bench")
+    _copy_package(cache)
+    report = {"python": sys.version.split()[0],
+              "implementation": platform.python_implementation(),
+              "platform": platform.platform(),
+              "runs": runs,
+              "targets": {}}
+    try:
+        for target in targets:
+            cold = [measure(target) for i in range(runs)]
+            # The first run fills the cache and is not counted.
+            measure(target, cache)
+            warm = [measure(target, cache) for i in range(runs)]
+            report["version"] = warm[0]["version"]
+            report["dll"] = warm[0]["dll"]
+            report["targets"][target] = {
+                "cold": _summary([result["ms"] for result in cold]),
+                "warm": _summary([result["ms"] for result in warm]),
+                "modules": warm[0]["modules"],
+                "external": warm[0]["ms"] - sum(module["self"] for module
+                                                in warm[0]["modules"]),
+                "bindings": {"stubs": warm[0]["stubs"],
+                             "resolved": warm[0]["resolved"],
+                             "resolve_ms": _summary([result["resolve_ms"]
+                                                     for result in warm])},
+            }
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+    return report
+
+
+def run():
+    optparser = optparse.OptionParser(usage="%prog [options] [MODULE ...]")
+    optparser.add_option("-n", "--runs", type="int", default=5,
+                         help="imports to time for each module and cache "
+                         "state (default: 5)")
+    optparser.add_option("-o", "--output", type="string",
+                         help="write the report to a file instead of stdout")
+    options, args = optparser.parse_args()
+    report = run_benchmark(args, max(options.runs, 1))
+    data = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as fp:
+            fp.write(data + "\n")
+    else:
+        print(data)
+    for target, result in report["targets"].items():
+        sys.stderr.write("%-12s cold %8.1f ms  warm %8.1f ms  %4d bindings\n" %
+                         (target, result["cold"]["median"],
+                          result["warm"]["median"],
+                          result["bindings"]["stubs"] +
+                          result["bindings"]["resolved"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,7 @@
+"""Unit tests for Pong-Classic.
+
+Run them from the directory holding Pong.py with
+
+    python -m unittest discover -s test -p "*_test.py" -t .
+
+"""
@@ -0,0 +1,80 @@
+import sys
+import unittest
+from collision import *
+
+
+class CollisionTest(unittest.TestCase):
+
+    def test_Intersects(self):
+        self.assertTrue(Intersects((0, 0, 10, 10), (5, 5, 10, 10)))
+        self.assertTrue(Intersects((0, 0, 10, 10), (2, 2, 2, 2)))
+        """ touching edges or corners is not intersecting, like SDL_HasIntersection """
+        self.assertFalse(Intersects((0, 0, 10, 10), (10, 0, 10, 10)))
+        self.assertFalse(Intersects((0, 0, 10, 10), (10, 10, 10, 10)))
+        self.assertFalse(Intersects((0, 0, 10, 10), (2, 2, 0, 5)))
+
+    def test_Segment_Hit(self):
+        box = (20, 100, 17, 119)
+        self.assertEqual(Segment_Hit(box, 17, (0, 0, 20, 20)), (False, -1))
+        self.assertEqual(Segment_Hit(box, 17, (30, 90, 20, 20)), (True, 0))
+        self.assertEqual(Segment_Hit(box, 17, (30, 134, 20, 20)), (True, 2))
+        self.assertEqual(Segment_Hit(box, 17, (30, 216, 20, 20)), (True, 6))
+
+    def test_First_Hit(self):
+        boxes = [(0, 0, 100, 20), (0, 700, 100, 20)]
+        self.assertEqual(First_Hit(boxes, (10, 690, 20, 20)), (True, 1))
+        self.assertEqual(First_Hit(boxes, (10, 300, 20, 20)), (False, -1))
+
+    def test_Axis_Times(self):
+        self.assertEqual(Axis_Times(0, 10, 20, 30, 10), (1.0, 2.0))
+        self.assertEqual(Axis_Times(50, 10, -20, 30, 10), (0.5, 1.5))
+        self.assertEqual(Axis_Times(0, 10, 0, 5, 10), (float('-inf'), float('inf')))
+        self.assertEqual(Axis_Times(0, 10, 0, 10, 10), (None, None))
+
+    def test_Sweep(self):
+        self.assertEqual(Sweep((0, 0, 10, 10), 20, 0, (15, 0, 10, 10)), (0.25, 0))
+        self.assertEqual(Sweep((0, 20, 10, 10), 0, -20, (0, 0, 10, 10)), (0.5, 1))
+        """ moving away, falling short and already overlapping are all misses """
+        self.assertIsNone(Sweep((0, 0, 10, 10), -20, 0, (15, 0, 10, 10)))
+        self.assertIsNone(Sweep((0, 0, 10, 10), 4, 0, (15, 0, 10, 10)))
+        self.assertIsNone(Sweep((0, 0, 10, 10), 20, 0, (5, 0, 10, 10)))
+
+    def test_Sweep_tunnelling(self):
+        """ A step many times longer than the target is wide still stops at its face """
+        result = Sweep((0, 0, 20, 20), 10000, 0, (1245, 0, 17, 119))
+        self.assertIsNotNone(result)
+        self.assertAlmostEqual(result[0] * 10000, 1225)
+        self.assertEqual(result[1], 0)
+        result = Sweep((0, 0, 20, 20), 10000, 10000, (5000, 5000, 1, 1))
+        self.assertAlmostEqual(result[0] * 10000, 4980)
+
+    def test_Sweep_corners(self):
+        """ Reaching both faces at the same time counts as a left or right face """
+        self.assertEqual(Sweep((0, 0, 10, 10), 20, 20, (20, 20, 10, 10)), (0.5, 0))
+        """ only sliding along an edge or grazing a corner never touches """
+        self.assertIsNone(Sweep((0, 0, 10, 10), 20, 0, (20, 10, 10, 10)))
+        self.assertIsNone(Sweep((0, 0, 10, 10), 20, 20, (20, 0, 10, 10)))
+        self.assertIsNone(Sweep((0, 0, 10, 10), 20, 20, (0, 20, 10, 10)))
+
+    def test_Intercept(self):
+        self.assertAlmostEqual(Intercept(0, 100, 0, 500, 0, 680), 100)
+        self.assertIsNone(Intercept(0, 100, 180, 500, 0, 680))
+        self.assertIsNone(Intercept(0, 100, 90, 500, 0, 680))
+        self.assertIsNone(Intercept(0, 100, 270, 500, 0, 680))
+        self.assertAlmostEqual(Intercept(500, 100, 90, 500, 0, 680), 100)
+        self.assertEqual(Intercept(0, 100, 45, 500, 50, 50), 50)
+
+    def test_Intercept_unfolding(self):
+        """ At 45 degrees the ball moves as far down as it moves across, and every
+            bounce off the top or bottom turns it around """
+        self.assertAlmostEqual(Intercept(0, 0, 45, 50, 0, 100), 50)
+        self.assertAlmostEqual(Intercept(0, 0, 45, 150, 0, 100), 50)
+        self.assertAlmostEqual(Intercept(0, 0, 45, 250, 0, 100), 50)
+        self.assertAlmostEqual(Intercept(0, 0, 45, 420, 0, 100), 20)
+        self.assertAlmostEqual(Intercept(0, 50, 315, 100, 0, 100), 50)
+        self.assertAlmostEqual(Intercept(400, 20, 135, 0, 0, 100), 20)
+        self.assertAlmostEqual(Intercept(10, 30, 45, 110, 20, 120), 110)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
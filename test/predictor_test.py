@@ -0,0 +1,66 @@
+import sys
+import random
+import unittest
+import Pong
+
+
+class PredictorTest(unittest.TestCase):
+
+    def conceded(self, difficulty, matches = 3, seed = 0):
+        """ Points the computer player lets in against Follow_Ball """
+        predictor = Pong.Predictor(*Pong.DIFFICULTIES[difficulty], seed = seed)
+        results = Pong.Headless(matches, controllers = (predictor, Pong.Follow_Ball), max_ticks = 20000)
+        return sum(result[0][1] for result in results)
+
+    def test_difficulties(self):
+        easy = self.conceded('easy')
+        self.assertGreater(easy, 0)
+        self.assertGreater(easy, self.conceded('hard'))
+        self.assertEqual(self.conceded('perfect'), 0)
+
+    def test_wall_bounce(self):
+        """ A wall bounce doesn't change where the ball crosses, so it isn't a new
+            heading and doesn't start the reaction over """
+        sim = Pong.Simulation(None)
+        sim.Start()
+        predictor = Pong.Predictor(0.5)
+        sim.ball.Set_Position((700, 300))
+        sim.degree = 150
+        predictor(sim, 0)
+        ready = predictor.ready[0]
+        self.assertGreater(ready, sim.tick)
+        sim.degree = 210
+        predictor(sim, 0)
+        self.assertEqual(predictor.ready[0], ready)
+        sim.degree = 30
+        predictor(sim, 0)
+        self.assertEqual(predictor.ready[0], sim.tick)
+
+    def test_CONTROLLERS(self):
+        """ Every run gets a Predictor of its own, so no plans carry over """
+        first = Pong.CONTROLLERS['predict']('normal')
+        self.assertIsNot(first, Pong.CONTROLLERS['predict']('normal'))
+        self.assertEqual((first.reaction, first.error), Pong.DIFFICULTIES['normal'])
+        self.assertIs(Pong.CONTROLLERS['follow']('easy'), Pong.Follow_Ball)
+
+    @unittest.skipIf(Pong.numpy is None, "numpy is not available")
+    def test_Batch_Predictor(self):
+        """ With no error it makes the same moves as Predictor, step for step """
+        numpy = Pong.numpy
+        rng = random.Random(3)
+        sim = Pong.Simulation(None)
+        sim.Start()
+        batch = Pong.BatchSimulation(1)
+        predictor = Pong.Predictor(0.5)
+        batch_predictor = Pong.Batch_Predictor(0.5)
+        for tick in range(3000):
+            move = predictor(sim, 0)
+            batch_move = batch_predictor(batch, 0)
+            self.assertEqual(move, (bool(batch_move[0][0]), bool(batch_move[1][0])), 'step %d' % tick)
+            other = Pong.Follow_Ball(sim, 1) if rng.random() < 0.9 else (False, False)
+            sim.Step(move + other)
+            batch.Step(tuple(numpy.array([key]) for key in move + other))
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
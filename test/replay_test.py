@@ -0,0 +1,77 @@
+import os
+import sys
+import random
+import shutil
+import struct
+import tempfile
+import zlib
+import unittest
+import Pong
+
+
+class ReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix = 'pongtest')
+        self.path = os.path.join(self.directory, 'game.rec')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors = True)
+
+    def play(self, steps, hz = Pong.TICK_RATE, seed = 1):
+        """ Plays a game from the menu with random keys and clicks, recording every step
+            the way the main loop does, and returns the simulation it ended with """
+        rng = random.Random(seed)
+        sim = Pong.Simulation(None, hz)
+        recorder = Pong.Recorder(hz)
+        for tick in range(steps):
+            controls = tuple(rng.random() < 0.3 for key in range(4))
+            actions = 0
+            if tick == 10:
+                actions = Pong.ACTION_START
+            elif rng.random() < 0.002:
+                actions = rng.choice((Pong.ACTION_PAUSE, Pong.ACTION_RESTART, Pong.ACTION_MENU, Pong.ACTION_START))
+            recorder.Add(controls, actions)
+            sim.Step(controls, actions)
+        recorder.Save(self.path)
+        return sim
+
+    def test_Play_Replay(self):
+        sim = self.play(6000)
+        replayed = Pong.Play_Replay(self.path)
+        self.assertEqual(replayed.tick, 6000)
+        self.assertEqual(replayed.Snapshot(), sim.Snapshot())
+        self.assertEqual(replayed.Checksum(), sim.Checksum())
+        self.assertEqual(Pong.Play_Replay(self.path).Checksum(), sim.Checksum())
+
+    def test_Play_Replay_hz(self):
+        """ The replay keeps the step rate it was recorded at """
+        sim = self.play(2000, hz = 60, seed = 2)
+        replayed = Pong.Play_Replay(self.path)
+        self.assertEqual(replayed.hz, 60)
+        self.assertEqual(replayed.Checksum(), sim.Checksum())
+
+    def test_Replay(self):
+        Pong.Recorder(Pong.TICK_RATE).Save(self.path)
+        replay = Pong.Replay(self.path)
+        self.assertTrue(replay.Done())
+        recorder = Pong.Recorder(Pong.TICK_RATE)
+        recorder.Add((True, False, False, True), Pong.ACTION_START)
+        recorder.Save(self.path)
+        replay = Pong.Replay(self.path)
+        self.assertEqual(replay.Next(), ((True, False, False, True), Pong.ACTION_START))
+        self.assertTrue(replay.Done())
+
+    def test_Replay_broken(self):
+        with open(self.path, 'wb') as output:
+            output.write(b'not a replay at all')
+        self.assertRaises(ValueError, Pong.Replay, self.path)
+        """ a header promising more steps than there are """
+        with open(self.path, 'wb') as output:
+            output.write(Pong.REPLAY_MAGIC + struct.pack('<HI', Pong.TICK_RATE, 100))
+            output.write(zlib.compress(bytes(10)))
+        self.assertRaises(ValueError, Pong.Replay, self.path)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
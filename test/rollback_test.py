@@ -0,0 +1,68 @@
+import sys
+import unittest
+import netplay
+import Pong
+
+
+class RollbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        clock = lambda: self.now
+        host = netplay.Link(address = '127.0.0.1')
+        guest = netplay.Link(peer = host.address, address = '127.0.0.1')
+        self.sessions = [Pong.Rollback(None, netplay.Shim(host, 0.03, 0.0, 0.0, 0, clock), 0),
+                         Pong.Rollback(None, netplay.Shim(guest, 0.03, 0.0, 0.0, 1, clock), 1)]
+
+    def tearDown(self):
+        for session in self.sessions:
+            session.Close()
+
+    def test_Catch_Up(self):
+        steps = []
+        self.assertAlmostEqual(Pong.Catch_Up(0.035, 0.01, lambda: steps.append(1) or True), 0.005)
+        self.assertEqual(len(steps), 3)
+        self.assertEqual(Pong.Catch_Up(0.5, 0.01, lambda: False), 0.01)
+        self.assertEqual(Pong.Catch_Up(0.005, 0.01, lambda: False), 0.005)
+
+    def test_frames_meet(self):
+        """ Both sides run the main loop's accumulator at 60 frames a second, and the
+            guest starts half a second before the host. The waits have to bring them
+            together instead of being made up for. """
+        frame = 1.0 / 60
+        start = (0.5, 0.0)
+        accumulators = [0.0, 0.0]
+        gaps = []
+        for i in range(600):
+            self.now += frame
+            for session in self.sessions:
+                if self.now < start[session.player]:
+                    continue
+                step = lambda: session.Advance((False, False))
+                accumulators[session.player] = Pong.Catch_Up(accumulators[session.player] + frame,
+                                                              session.sim.dt, step)
+            if i >= 300:
+                gaps.append(self.sessions[1].frame - self.sessions[0].frame)
+        self.assertLessEqual(max(abs(gap) for gap in gaps), 6)
+        for session, accumulator in zip(self.sessions, accumulators):
+            self.assertLessEqual(accumulator, session.sim.dt)
+        self.assertGreater(self.sessions[0].frame, 500)
+
+    def test_Timed_Out(self):
+        guest = self.sessions[1]
+        self.assertTrue(guest.link.Connected())
+        self.assertFalse(guest.Timed_Out(-1.0))
+        guest.Send()
+        self.now += 1.0
+        guest.Poll()
+        host = self.sessions[0]
+        for i in range(100):
+            host.Poll()
+            if host.heard is not None:
+                break
+        self.assertTrue(host.Timed_Out(-1.0))
+        self.assertFalse(host.Timed_Out(5.0))
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
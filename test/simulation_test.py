@@ -0,0 +1,97 @@
+import sys
+import random
+import unittest
+import Pong
+
+
+class SimulationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = Pong.Simulation(None)
+
+    def test_Sweep_Ball_tunnelling(self):
+        """ However far the ball goes in one step, it stops at the paddle in its way """
+        sim = self.sim
+        paddle = sim.paddles[1]
+        sim.ball.Set_Position((600, paddle.y))
+        degree = Pong.Sweep_Ball(sim.ball, 0, 100000, sim.wall, sim.paddles, bounces = 1)
+        self.assertEqual(sim.ball.x, paddle.box[0] - sim.ball.box[2])
+        self.assertIn(degree, Pong.PADDLE_ANGLES[1])
+        """ and with bounces to spare it comes back off it """
+        sim.ball.Set_Position((600, paddle.y))
+        degree = Pong.Sweep_Ball(sim.ball, 0, 1000, sim.wall, sim.paddles)
+        self.assertLess(sim.ball.x, paddle.box[0])
+        self.assertIn(degree, Pong.PADDLE_ANGLES[1])
+
+    def test_Sweep_Ball_walls(self):
+        """ Bouncing off the walls ends up where Intercept says it will """
+        sim = self.sim
+        walls = sim.wall.boxes
+        h = sim.ball.box[3]
+        top = walls[0][1] + walls[0][3]
+        bottom = walls[1][1] - h
+        for degree in (30, 45, 60, 300, 315, 330):
+            sim.ball.Set_Position((100, 300))
+            direction = Pong.DIRECTIONS[degree]
+            degree_after = Pong.Sweep_Ball(sim.ball, degree, 900 / direction[0], sim.wall, [], bounces = 8)
+            self.assertAlmostEqual(sim.ball.x, 1000)
+            self.assertAlmostEqual(sim.ball.y, Pong.Intercept(100, 300, degree, 1000, top, bottom))
+            self.assertIn(degree_after, (degree, 360 - degree))
+
+    def test_Sweep_Ball_corner(self):
+        """ Coming down on the top corner of a paddle bounces off its first piece """
+        sim = self.sim
+        paddle = sim.paddles[1]
+        top = paddle.box[1]
+        sim.ball.Set_Position((paddle.box[0] - 10, top - 60))
+        degree = Pong.Sweep_Ball(sim.ball, 80, 200, sim.wall, sim.paddles, bounces = 1)
+        self.assertEqual(sim.ball.y, top - sim.ball.box[3])
+        self.assertEqual(degree, Pong.PADDLE_ANGLES[1][0])
+
+    def test_Sweep_Ball_bounces(self):
+        """ After the last bounce allowed the rest of the distance is dropped """
+        sim = self.sim
+        walls = sim.wall.boxes
+        for bounces, y in ((2, walls[0][1] + walls[0][3]), (3, walls[1][1] - sim.ball.box[3])):
+            sim.ball.Set_Position((600, 300))
+            Pong.Sweep_Ball(sim.ball, 90, 100000, sim.wall, [], bounces = bounces)
+            self.assertEqual(sim.ball.y, y)
+
+    def test_Headless(self):
+        """ Follow_Ball never misses, so only the step limit ends the match """
+        self.assertEqual(Pong.Headless(), [((0, 0), Pong.MAX_TICKS)])
+        self.assertEqual(Pong.Headless(2, max_ticks = 100), [((0, 0), 100), ((0, 0), 100)])
+
+    @unittest.skipIf(Pong.numpy is None, "numpy is not available")
+    def test_BatchSimulation_lockstep(self):
+        """ Every match of a batch stays the same as a Simulation given the same
+            controls, step for step """
+        numpy = Pong.numpy
+        n = 8
+        rng = random.Random(1)
+        sims = [Pong.Simulation(None) for i in range(n)]
+        for sim in sims:
+            sim.Start()
+        batch = Pong.BatchSimulation(n)
+        for tick in range(4000):
+            controls = []
+            for i in range(n):
+                if i % 2 == 0:
+                    controls.append(Pong.Follow_Ball(sims[i], 0) + (rng.random() < 0.3, rng.random() < 0.3))
+                else:
+                    controls.append(tuple(rng.random() < 0.3 for key in range(4)))
+                sims[i].Step(controls[i])
+            keys = numpy.array(controls)
+            batch.Step(tuple(keys[:, key] for key in range(4)))
+            for i in range(n):
+                sim = sims[i]
+                self.assertEqual((sim.ball.x, sim.ball.y, sim.degree, sim.paddles[0].y, sim.paddles[1].y,
+                                  sim.scores[0], sim.scores[1], sim.game_over),
+                                 (batch.ball_x[i], batch.ball_y[i], batch.degree[i], batch.paddle_y[i, 0],
+                                  batch.paddle_y[i, 1], batch.scores[i, 0], batch.scores[i, 1],
+                                  batch.game_over[i]), 'match %d, step %d' % (i, tick))
+        self.assertGreater(int(batch.scores.sum()), 0)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())